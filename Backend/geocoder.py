@@ -12,13 +12,20 @@ Usage:
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 
 from geocoding.api import router
-from geocoding.dependencies import cleanup_services, get_redis_cache
+from geocoding.dependencies import cleanup_services, get_redis_cache, init_services
 from geocoding.config import get_settings
+from geocoding.exceptions import (
+    GeocodingError,
+    PlaceNotFoundError,
+    ExternalGeocodingError,
+    DatabaseError
+)
 
 # Configure logging
 logging.basicConfig(
@@ -37,6 +44,7 @@ async def lifespan(app: FastAPI):
     - Initialize Redis cache
     - Log configuration
     - Verify settings loaded
+    - Build service singletons and store them on app.state
     
     Shutdown:
     - Cleanup services
@@ -63,6 +71,9 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("Redis caching disabled")
     
+    # Build service singletons up front so the first request doesn't pay for it
+    app.state.geocoding_service = await init_services()
+    
     logger.info("Service ready to accept requests")
     
     yield
@@ -105,9 +116,9 @@ app = FastAPI(
     
     Use `GeocodingService.geocode_batch_simple()` for a simple list-to-list interface:
     ```python
-    from geocoding import get_geocoding_service
+    from geocoding import init_services
     
-    service = get_geocoding_service()
+    service = await init_services()
     place_names = ["Islamabad", "Lahore", "Karachi"]
     place_ids = await service.geocode_batch_simple(place_names)
     # Returns: ["uuid-1", "uuid-2", "uuid-3"]
@@ -115,19 +126,24 @@ app = FastAPI(
     """,
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
 
-# CORS middleware for frontend access
+# CORS middleware for frontend access. Concrete origins/methods/headers keep
+# Starlette on its set-membership fast path (and "*" + credentials is invalid)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=get_settings().cors_origin_list,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
 )
 
+# Compress large batch responses (repeated JSON keys compress very well)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include routers
 app.include_router(router)
 
@@ -151,7 +167,7 @@ async def root():
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
     """Custom 404 handler"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
         content={
             "error": "Not Found",
@@ -161,11 +177,34 @@ async def not_found_handler(request: Request, exc):
     )
 
 
+# HTTP status for each typed geocoding error (anything else maps to 500)
+_GEOCODING_ERROR_STATUS = {
+    PlaceNotFoundError: 404,
+    ExternalGeocodingError: 502,
+    DatabaseError: 503,
+}
+
+
+@app.exception_handler(GeocodingError)
+async def geocoding_error_handler(request: Request, exc: GeocodingError):
+    """Translate typed geocoding errors raised by routes/services into HTTP responses"""
+    status_code = _GEOCODING_ERROR_STATUS.get(type(exc), 500)
+    if status_code >= 500:
+        logger.error(f"Geocoding error: {exc}", exc_info=exc)
+    return ORJSONResponse(
+        status_code=status_code,
+        content={
+            "error": type(exc).__name__,
+            "message": str(exc)
+        }
+    )
+
+
 @app.exception_handler(500)
 async def internal_error_handler(request: Request, exc):
     """Custom 500 handler"""
     logger.error(f"Internal error: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
@@ -177,11 +216,16 @@ async def internal_error_handler(request: Request, exc):
 if __name__ == "__main__":
     import uvicorn
     
-    # Run with uvicorn
+    # Run with uvicorn on uvloop + httptools (faster event loop and HTTP parser)
+    # For production, drop reload and run under gunicorn instead:
+    #   gunicorn -k uvicorn.workers.UvicornWorker -w 4 geocoder:app
     uvicorn.run(
         "geocoder:app",
         host="0.0.0.0",
         port=8000,
+        loop="uvloop",
+        http="httptools",
+        interface="asgi3",
         reload=True,  # Disable in production
         log_level="info"
     )
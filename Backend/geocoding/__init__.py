@@ -40,6 +40,7 @@ from .dependencies import (
     get_external_geocoder,
     get_directional_parser,
     get_geocoding_service,
+    init_services,
     cleanup_services
 )
 
@@ -77,5 +78,6 @@ __all__ = [
     'get_external_geocoder',
     'get_directional_parser',
     'get_geocoding_service',
+    'init_services',
     'cleanup_services',
 ]
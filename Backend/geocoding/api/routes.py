@@ -1,22 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from typing import AsyncIterator, List
 import logging
+import orjson
 
-from ..models import GeocodeRequest, GeocodeResponse, GeocodeResult
-from ..services.geocoding_service import GeocodingService
-from ..dependencies import get_geocoding_service
+from ..models import GeocodeOptions, GeocodeRequest, GeocodeResponse, GeocodeResult
+from .. import dependencies
 
 logger = logging.getLogger(__name__)
 
+# Pre-built validators/serializers for the batch endpoints. Validating the raw
+# body and dumping straight to JSON bytes goes through pydantic-core directly,
+# skipping FastAPI's per-request body and response_model handling.
+_REQUEST_ADAPTER = TypeAdapter(GeocodeRequest)
+_RESPONSE_ADAPTER = TypeAdapter(GeocodeResponse)
+
+# Keeps the request body documented in OpenAPI even though it's parsed manually
+_GEOCODE_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": GeocodeRequest.model_json_schema()}}
+    }
+}
+
 router = APIRouter(
     prefix="/api/v1",
     tags=["geocoding"]
 )
 
 
+async def _parse_geocode_request(http_request: Request) -> GeocodeRequest:
+    """
+    Validate the raw JSON body against GeocodeRequest.
+    
+    Raises:
+        RequestValidationError: Rendered by FastAPI as the usual 422 response
+    """
+    body = await http_request.body()
+    try:
+        return _REQUEST_ADAPTER.validate_json(body)
+    except ValidationError as e:
+        errors = [
+            {**error, "loc": ("body", *error["loc"])}
+            for error in e.errors(include_url=False)
+        ]
+        raise RequestValidationError(errors, body=body)
+
+
 @router.post(
     "/geocode",
-    response_model=GeocodeResponse,
+    response_class=Response,
+    responses={status.HTTP_200_OK: {"model": GeocodeResponse}},
+    openapi_extra=_GEOCODE_REQUEST_BODY,
     status_code=status.HTTP_200_OK,
     summary="Geocode location strings to place IDs",
     description="""
@@ -36,55 +73,109 @@ router = APIRouter(
     """
 )
 async def geocode_locations(
-    request: GeocodeRequest,
-    service: GeocodingService = Depends(get_geocoding_service)
-) -> GeocodeResponse:
+    http_request: Request,
+) -> Response:
     """
     Geocode one or more location strings.
     
+    The body is validated with a pre-built TypeAdapter, and results (already
+    validated models from the service) are dumped straight to JSON bytes
+    instead of being re-validated against a response_model.
+    
     Args:
-        request: GeocodeRequest with locations list and options
-        service: Injected GeocodingService instance
+        http_request: Raw request carrying a GeocodeRequest JSON body
         
     Returns:
-        GeocodeResponse with results for each location
+        Pre-serialized GeocodeResponse with results for each location
         
     Raises:
-        HTTPException: If validation fails or internal error occurs
+        RequestValidationError: If the body is not a valid GeocodeRequest (422)
+        GeocodingError: Translated to an HTTP error by the app-level handler
     """
-    try:
-        logger.info(f"Geocoding request for {len(request.locations)} location(s)")
+    request = await _parse_geocode_request(http_request)
+    
+    logger.debug(f"Geocoding request for {len(request.locations)} location(s)")
+    
+    # Deduplicate identical locations (order-preserving) before dispatch,
+    # then fan results back out to the original order and length
+    unique_locations = list(dict.fromkeys(request.locations))
+    
+    # Process batch of locations
+    unique_results = await dependencies.SERVICE.geocode_batch(
+        unique_locations,
+        request.options
+    )
+    
+    if len(unique_locations) == len(request.locations):
+        results = unique_results
+    else:
+        result_by_location = dict(zip(unique_locations, unique_results))
+        results = [result_by_location[loc] for loc in request.locations]
+    
+    # Separate errors from results and count successes in a single pass
+    errors = []
+    success_count = 0
+    for result in results:
+        if result.matched_places:
+            success_count += 1
+        elif result.error:
+            errors.append(f"{result.input}: {result.error}")
+    
+    # Log summary
+    logger.debug(
+        f"Geocoding complete: {success_count}/{len(results)} successful, "
+        f"{len(errors)} errors"
+    )
+    
+    response = GeocodeResponse.model_construct(
+        results=results,
+        errors=errors
+    )
+    return Response(
+        content=_RESPONSE_ADAPTER.dump_json(response),
+        media_type="application/json"
+    )
+
+
+@router.post(
+    "/geocode/stream",
+    response_class=StreamingResponse,
+    responses={status.HTTP_200_OK: {"content": {"application/x-ndjson": {}}}},
+    openapi_extra=_GEOCODE_REQUEST_BODY,
+    status_code=status.HTTP_200_OK,
+    summary="Geocode location strings, streaming results as NDJSON",
+    description="""
+    Same input as `POST /geocode`, but each `GeocodeResult` is written as one
+    JSON line as soon as it is ready. Intended for very large batches.
+    
+    Lines arrive in completion order, not input order; use each result's
+    `input` field to correlate it with the request.
+    """
+)
+async def geocode_locations_stream(
+    http_request: Request,
+) -> StreamingResponse:
+    """
+    Geocode one or more location strings, streaming results as NDJSON.
+    
+    Args:
+        http_request: Raw request carrying a GeocodeRequest JSON body
         
-        # Process batch of locations
-        results = await service.geocode_batch(
+    Returns:
+        StreamingResponse yielding one serialized GeocodeResult per line
+    """
+    request = await _parse_geocode_request(http_request)
+    
+    logger.debug(f"Streaming geocoding request for {len(request.locations)} location(s)")
+    
+    async def ndjson_lines() -> AsyncIterator[bytes]:
+        async for result in dependencies.SERVICE.geocode_stream(
             request.locations,
             request.options
-        )
-        
-        # Separate errors from results
-        errors = []
-        for result in results:
-            if result.error and not result.matched_places:
-                errors.append(f"{result.input}: {result.error}")
-        
-        # Log summary
-        success_count = len([r for r in results if r.matched_places])
-        logger.info(
-            f"Geocoding complete: {success_count}/{len(results)} successful, "
-            f"{len(errors)} errors"
-        )
-        
-        return GeocodeResponse(
-            results=results,
-            errors=errors
-        )
-        
-    except Exception as e:
-        logger.error(f"Geocoding request failed: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error during geocoding"
-        )
+        ):
+            yield orjson.dumps(result.model_dump(mode="json")) + b"\n"
+    
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
 
 
 @router.get(
@@ -98,7 +189,6 @@ async def geocode_single_location(
     location: str,
     prefer_lower_admin_levels: bool = True,
     include_confidence_scores: bool = False,
-    service: GeocodingService = Depends(get_geocoding_service)
 ) -> GeocodeResponse:
     """
     Geocode a single location via GET request.
@@ -107,38 +197,27 @@ async def geocode_single_location(
         location: Location string to geocode
         prefer_lower_admin_levels: Prefer more specific places when scores are similar
         include_confidence_scores: Include confidence scores in response
-        service: Injected GeocodingService instance
         
     Returns:
         GeocodeResponse with single result
     """
-    try:
-        from ..models import GeocodeOptions
-        
-        options = GeocodeOptions(
-            prefer_lower_admin_levels=prefer_lower_admin_levels,
-            include_confidence_scores=include_confidence_scores
-        )
-        
-        logger.info(f"GET geocoding request for: {location}")
-        
-        result = await service.geocode_location(location, options, None)
-        
-        errors = []
-        if result.error and not result.matched_places:
-            errors.append(f"{result.input}: {result.error}")
-        
-        return GeocodeResponse(
-            results=[result],
-            errors=errors
-        )
-        
-    except Exception as e:
-        logger.error(f"Single geocoding request failed: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error during geocoding"
-        )
+    options = GeocodeOptions(
+        prefer_lower_admin_levels=prefer_lower_admin_levels,
+        include_confidence_scores=include_confidence_scores
+    )
+    
+    logger.debug(f"GET geocoding request for: {location}")
+    
+    result = await dependencies.SERVICE.geocode_location(location, options, None)
+    
+    errors = []
+    if result.error and not result.matched_places:
+        errors.append(f"{result.input}: {result.error}")
+    
+    return GeocodeResponse(
+        results=[result],
+        errors=errors
+    )
 
 
 @router.get(
@@ -149,7 +228,6 @@ async def geocode_single_location(
 async def suggest_locations(
     location: str,
     limit: int = 3,
-    service: GeocodingService = Depends(get_geocoding_service)
 ):
     """
     Get alternative suggestions for a location string.
@@ -157,32 +235,23 @@ async def suggest_locations(
     Args:
         location: Location string to find suggestions for
         limit: Maximum number of suggestions to return
-        service: Injected GeocodingService instance
         
     Returns:
         List of suggested places with similarity scores
     """
-    try:
-        suggestions = await service.suggest_alternatives(location, limit)
-        
-        return {
-            "input": location,
-            "suggestions": [
-                {
-                    "name": s['name'],
-                    "hierarchy_level": s['hierarchy_level'],
-                    "similarity_score": s.get('similarity_score')
-                }
-                for s in suggestions
-            ]
-        }
-        
-    except Exception as e:
-        logger.error(f"Suggestion request failed: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error fetching suggestions"
-        )
+    suggestions = await dependencies.SERVICE.suggest_alternatives(location, limit)
+    
+    return {
+        "input": location,
+        "suggestions": [
+            {
+                "name": s['name'],
+                "hierarchy_level": s['hierarchy_level'],
+                "similarity_score": s.get('similarity_score')
+            }
+            for s in suggestions
+        ]
+    }
 
 
 @router.get(
@@ -2,7 +2,7 @@ from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     """
@@ -21,8 +21,16 @@ class Settings(BaseSettings):
     fuzzy_match_threshold: float = 0.85
     prefer_lower_admin_levels: bool = True
     
+    # Batch processing
+    batch_concurrency: int = 20  # Max locations geocoded concurrently per batch
+    
+    # CORS - comma-separated list of allowed browser origins (CORS_ORIGINS).
+    # Empty by default: the service is called server-to-server.
+    cors_origins: str = ""
+    
     # Caching
     cache_ttl_days: int = 30
+    result_cache_size: int = 10_000  # In-process LRU of resolved geocode results
     
     # Redis configuration
     redis_host: str = "localhost"
@@ -35,6 +43,8 @@ class Settings(BaseSettings):
     redis_ttl_directional: int = 3600  # 1 hour for directional queries
     redis_ttl_fuzzy: int = 7200  # 2 hours for fuzzy name searches
     redis_ttl_external: int = 86400 * 30  # 30 days for external API results
+    redis_ttl_place: int = 300  # 5 minutes for place rows by ID
+    redis_ttl_jitter: float = 0.1  # Spread each TTL by ±10% so bursts don't expire together
     
     model_config = SettingsConfigDict(
         env_file=str(Path(__file__).parent.parent / ".env"),
@@ -42,6 +52,11 @@ class Settings(BaseSettings):
         extra='ignore',  # Ignore extra fields in .env
         case_sensitive=False  # Allow case-insensitive matching
     )
+    
+    @property
+    def cors_origin_list(self) -> List[str]:
+        """Parsed CORS origins (blank entries dropped)"""
+        return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
 
 @lru_cache()
 def get_settings() -> Settings:
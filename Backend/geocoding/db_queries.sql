@@ -14,10 +14,33 @@ ON places USING gin(name gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_places_polygon 
 ON places USING gist(polygon);
 
+-- SP-GiST spatial index: faster point-in-polygon / intersects probes and
+-- smaller on disk than GiST. Once the planner is seen to prefer it
+-- (EXPLAIN find_place_by_point / find_places_in_direction), idx_places_polygon can be dropped.
+CREATE INDEX IF NOT EXISTS idx_places_polygon_spgist 
+ON places USING spgist(polygon);
+
+-- Case-insensitive equality index for the exact-name fast path
+CREATE INDEX IF NOT EXISTS idx_places_name_lower 
+ON places(lower(name));
+
 -- Hierarchy level index
 CREATE INDEX IF NOT EXISTS idx_places_hierarchy 
 ON places(hierarchy_level);
 
+-- Parent index for children lookups / counts used by hierarchical aggregation.
+-- Composite so get_children(level=...) is served by one index; its parent_id
+-- prefix covers plain parent lookups, superseding idx_places_parent_id.
+CREATE INDEX IF NOT EXISTS idx_places_parent_level 
+ON places(parent_id, hierarchy_level);
+DROP INDEX IF EXISTS idx_places_parent_id;
+
+-- Query statistics, for finding slow RPCs (Supabase: Database > Query Performance)
+CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
+
+-- Refresh planner statistics after building indexes
+ANALYZE places;
+
 -- Function 1: Fuzzy name search with trigram similarity
 CREATE OR REPLACE FUNCTION search_places_fuzzy(
     search_name TEXT,
@@ -30,6 +53,11 @@ RETURNS TABLE (
     similarity_score REAL
 ) AS $$
 BEGIN
+    -- The % operator is what lets the planner use idx_places_name_trgm;
+    -- a bare similarity() > x predicate forces a sequential scan.
+    -- Set the operator's threshold for this transaction only.
+    PERFORM set_config('pg_trgm.similarity_threshold', similarity_threshold::TEXT, true);
+    
     RETURN QUERY
     SELECT 
         p.id,
@@ -37,7 +65,8 @@ BEGIN
         p.hierarchy_level,
         similarity(p.name, search_name)::REAL as similarity_score
     FROM places p
-    WHERE similarity(p.name, search_name) > similarity_threshold
+    WHERE p.name % search_name
+        AND similarity(p.name, search_name) > similarity_threshold
     ORDER BY similarity_score DESC, hierarchy_level DESC
     LIMIT 10;
 END;
@@ -193,4 +222,215 @@ BEGIN
         AND NOT (p.id = ANY(base_place_ids))                -- Exclude base region itself
     ORDER BY p.hierarchy_level DESC;
 END;
-$$ LANGUAGE plpgsql;
\ No newline at end of file
+$$ LANGUAGE plpgsql;
+-- Function 3: Direct child counts for a set of parents, aggregated server-side
+-- (returns one row per parent instead of one row per child)
+CREATE OR REPLACE FUNCTION children_counts(
+    parent_ids UUID[]
+)
+RETURNS TABLE (
+    parent_id UUID,
+    c BIGINT
+) AS $$
+    SELECT p.parent_id, COUNT(*)
+    FROM places p
+    WHERE p.parent_id = ANY(parent_ids)
+    GROUP BY p.parent_id;
+$$ LANGUAGE sql STABLE;
+
+-- Function 4: Fused lookup - fuzzy candidates, containing place for a point,
+-- and places in a direction of the best fuzzy candidate, in one round-trip.
+-- The base for the directional part is picked like NameMatcher does with
+-- prefer_lower_levels: among candidates within similarity_tolerance of the
+-- best score, the most specific (highest hierarchy_level) wins.
+CREATE OR REPLACE FUNCTION resolve_location(
+    search_name TEXT,
+    similarity_threshold REAL DEFAULT 0.85,
+    lon FLOAT DEFAULT NULL,
+    lat FLOAT DEFAULT NULL,
+    direction TEXT DEFAULT NULL,
+    similarity_tolerance REAL DEFAULT 0.05
+)
+RETURNS JSONB AS $$
+DECLARE
+    fuzzy_rows JSONB;
+    point_row JSONB;
+    directional_rows JSONB;
+    base_id UUID;
+BEGIN
+    SELECT COALESCE(jsonb_agg(to_jsonb(f)), '[]'::JSONB) INTO fuzzy_rows
+    FROM search_places_fuzzy(search_name, similarity_threshold) f;
+    
+    IF lon IS NOT NULL AND lat IS NOT NULL THEN
+        SELECT to_jsonb(pt) INTO point_row
+        FROM find_place_by_point(lon, lat) pt;
+    END IF;
+    
+    IF direction IS NOT NULL AND jsonb_array_length(fuzzy_rows) > 0 THEN
+        SELECT (c->>'id')::UUID INTO base_id
+        FROM jsonb_array_elements(fuzzy_rows) c
+        WHERE (fuzzy_rows->0->>'similarity_score')::REAL
+            - (c->>'similarity_score')::REAL <= similarity_tolerance
+        ORDER BY (c->>'hierarchy_level')::INT DESC,
+                 (c->>'similarity_score')::REAL DESC
+        LIMIT 1;
+        
+        SELECT COALESCE(jsonb_agg(to_jsonb(d)), '[]'::JSONB) INTO directional_rows
+        FROM find_places_in_direction(ARRAY[base_id], direction) d;
+    END IF;
+    
+    RETURN jsonb_build_object(
+        'fuzzy', fuzzy_rows,
+        'point', point_row,
+        'directional', COALESCE(directional_rows, '[]'::JSONB)
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function 5: Report required places indexes that are missing.
+-- pg_indexes isn't exposed through PostgREST, so startup checks go through this.
+CREATE OR REPLACE FUNCTION places_missing_indexes()
+RETURNS TABLE (
+    indexname TEXT
+) AS $$
+    SELECT required.name
+    FROM unnest(ARRAY[
+        'idx_places_name_trgm',
+        'idx_places_name_lower',
+        'idx_places_polygon',
+        'idx_places_hierarchy',
+        'idx_places_parent_level'
+    ]) AS required(name)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM pg_indexes i
+        WHERE i.tablename = 'places' AND i.indexname = required.name
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Function 6: A place and its descendants down to max_depth levels, in one
+-- recursive query instead of one get_children round-trip per level
+CREATE OR REPLACE FUNCTION get_subtree(
+    root UUID,
+    max_depth INT DEFAULT 2
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    parent_id UUID,
+    parent_name TEXT,
+    hierarchy_level INT,
+    depth INT
+) AS $$
+    WITH RECURSIVE tree AS (
+        SELECT p.id, p.name, p.parent_id, p.parent_name, p.hierarchy_level, 0 AS depth
+        FROM places p
+        WHERE p.id = root
+        
+        UNION ALL
+        
+        SELECT p.id, p.name, p.parent_id, p.parent_name, p.hierarchy_level, t.depth + 1
+        FROM places p
+        JOIN tree t ON p.parent_id = t.id
+        WHERE t.depth < max_depth
+    )
+    SELECT tree.id, tree.name, tree.parent_id, tree.parent_name, tree.hierarchy_level, tree.depth
+    FROM tree
+    ORDER BY tree.depth, tree.id;
+$$ LANGUAGE sql STABLE;
+
+-- Function 7: Exact-name probe with trigram fallback, in one call.
+-- Canonical names hit the idx_places_name_lower B-tree; only inputs with no
+-- exact match pay for the trigram search. Same result shape as search_places_fuzzy.
+-- A threshold of 1.0 can never be exceeded, so it skips the fallback entirely
+-- (the API passes it for inputs too short to search by trigram).
+CREATE OR REPLACE FUNCTION search_places_exact_or_fuzzy(
+    search_name TEXT,
+    similarity_threshold REAL DEFAULT 0.85
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    hierarchy_level INT,
+    similarity_score REAL
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT p.id, p.name, p.hierarchy_level, 1.0::REAL AS similarity_score
+    FROM places p
+    WHERE lower(p.name) = lower(search_name)
+    ORDER BY p.hierarchy_level DESC
+    LIMIT 5;
+    
+    IF NOT FOUND AND similarity_threshold < 1.0 THEN
+        RETURN QUERY
+        SELECT * FROM search_places_fuzzy(search_name, similarity_threshold);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function 8: Centroids for a set of places, in one call.
+-- Used as spatial context when disambiguating external geocoding results.
+CREATE OR REPLACE FUNCTION place_centroids(
+    place_ids UUID[]
+)
+RETURNS TABLE (
+    id UUID,
+    lon FLOAT,
+    lat FLOAT
+) AS $$
+    SELECT p.id, ST_X(c.geom), ST_Y(c.geom)
+    FROM places p
+    CROSS JOIN LATERAL (SELECT ST_Centroid(p.polygon) AS geom) c
+    WHERE p.id = ANY(place_ids)
+        AND p.polygon IS NOT NULL;
+$$ LANGUAGE sql STABLE;
+
+-- Function 9: search_places_exact_or_fuzzy for several names in one call.
+-- Thresholds are per name (short names are searched more strictly, see
+-- PlacesRepository.search_by_fuzzy_name). Rows carry the query they answer.
+CREATE OR REPLACE FUNCTION search_places_exact_or_fuzzy_batch(
+    search_names TEXT[],
+    similarity_thresholds REAL[]
+)
+RETURNS TABLE (
+    query TEXT,
+    id UUID,
+    name TEXT,
+    hierarchy_level INT,
+    similarity_score REAL
+) AS $$
+    SELECT q.name, m.id, m.name, m.hierarchy_level, m.similarity_score
+    FROM unnest(search_names, similarity_thresholds) WITH ORDINALITY AS q(name, threshold, ord)
+    CROSS JOIN LATERAL search_places_exact_or_fuzzy(q.name, q.threshold) m
+    ORDER BY q.ord, m.similarity_score DESC, m.hierarchy_level DESC;
+$$ LANGUAGE sql;
+
+-- Function 10: The given places and all of their ancestors, each with its
+-- direct-children count, in one recursive query. Hierarchical aggregation
+-- walks every level from this instead of one lookup + count round-trip per level.
+CREATE OR REPLACE FUNCTION ancestors_with_children_counts(
+    place_ids UUID[]
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    parent_id UUID,
+    parent_name TEXT,
+    hierarchy_level INT,
+    children_count BIGINT
+) AS $$
+    WITH RECURSIVE anc AS (
+        SELECT unnest(place_ids) AS id
+        
+        UNION
+        
+        SELECT p.parent_id
+        FROM places p
+        JOIN anc ON p.id = anc.id
+        WHERE p.parent_id IS NOT NULL
+    )
+    SELECT p.id, p.name, p.parent_id, p.parent_name, p.hierarchy_level,
+        (SELECT COUNT(*) FROM places c WHERE c.parent_id = p.id)
+    FROM anc
+    JOIN places p ON p.id = anc.id;
+$$ LANGUAGE sql STABLE;
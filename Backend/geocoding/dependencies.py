@@ -1,8 +1,11 @@
 from functools import lru_cache
-from supabase import create_client, Client
+from typing import Optional
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+import httpx
 import logging
 
 from .config import get_settings, Settings
+from .exceptions import ConfigurationError
 from .repositories.places_repository import PlacesRepository
 from .services.name_matcher import NameMatcher
 from .services.external_geocoder import ExternalGeocoder
@@ -43,7 +46,8 @@ async def get_redis_cache() -> RedisCache:
             port=settings.redis_port,
             db=settings.redis_db,
             password=settings.redis_password,
-            default_ttl_seconds=settings.redis_ttl_directional
+            default_ttl_seconds=settings.redis_ttl_directional,
+            ttl_jitter=settings.redis_ttl_jitter
         )
         await _redis_cache.connect()
         set_redis_cache(_redis_cache)  # Set global instance
@@ -56,48 +60,75 @@ async def get_redis_cache() -> RedisCache:
 # Supabase Client Dependency
 # ============================================================================
 
-@lru_cache()
-def get_supabase_client() -> Client:
+_supabase_client: Optional[AsyncClient] = None
+
+# PostgREST calls are HTTP requests; a long-lived HTTP/2 pool with generous
+# keep-alive amortizes TCP/TLS handshakes across requests
+_SUPABASE_HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=32,
+    keepalive_expiry=60
+)
+
+async def get_supabase_client() -> AsyncClient:
     """
-    Get Supabase client singleton.
+    Get async Supabase client singleton.
     
-    Cached to ensure single instance across app lifetime.
-    Thread-safe due to lru_cache.
+    Uses the async PostgREST path so database calls don't block the event loop,
+    over a shared keep-alive HTTP/2 connection pool.
+    Initializes on first call and reuses for subsequent requests.
     
     Returns:
-        Initialized Supabase client
+        Initialized async Supabase client
     """
-    settings = get_settings()
-    client = create_client(settings.supabase_url, settings.supabase_key)
-    logger.info("Supabase client initialized")
-    return client
+    global _supabase_client
+    
+    if _supabase_client is None:
+        settings = get_settings()
+        http_client = httpx.AsyncClient(
+            http2=True,
+            limits=_SUPABASE_HTTP_LIMITS,
+            timeout=120,  # Matches the postgrest client's default
+            follow_redirects=True
+        )
+        _supabase_client = await acreate_client(
+            settings.supabase_url,
+            settings.supabase_key,
+            options=AsyncClientOptions(httpx_client=http_client)
+        )
+        logger.info("Supabase client initialized")
+    
+    return _supabase_client
 
 
 # ============================================================================
 # Repository Layer Dependencies
 # ============================================================================
 
+@lru_cache(maxsize=1)
 def get_places_repository() -> PlacesRepository:
     """
-    Get PlacesRepository instance.
+    Get PlacesRepository singleton.
     
-    Creates new instance per request but reuses cached Supabase client.
-    Lightweight since repository is just a wrapper.
+    Cached so every service shares one repository over the cached Supabase client.
+    Requires get_supabase_client() to have been awaited (done by init_services()).
     
     Returns:
         PlacesRepository instance
     """
-    client = get_supabase_client()
-    return PlacesRepository(client)
+    if _supabase_client is None:
+        raise ConfigurationError("Supabase client not initialized - await init_services() first")
+    return PlacesRepository(_supabase_client)
 
 
 # ============================================================================
 # Service Layer Dependencies
 # ============================================================================
 
+@lru_cache(maxsize=1)
 def get_name_matcher() -> NameMatcher:
     """
-    Get NameMatcher service instance.
+    Get NameMatcher singleton.
     
     Returns:
         NameMatcher instance with injected repository
@@ -112,9 +143,13 @@ def get_name_matcher() -> NameMatcher:
     )
 
 
+@lru_cache(maxsize=1)
 def get_external_geocoder() -> ExternalGeocoder:
     """
-    Get ExternalGeocoder service instance.
+    Get ExternalGeocoder singleton.
+    
+    Cached so the pooled httpx client (opened via connect() at startup)
+    is shared across requests instead of rebuilt per call.
     
     Returns:
         ExternalGeocoder with API configuration
@@ -145,12 +180,14 @@ def get_directional_parser() -> DirectionalParser:
 # Main Orchestration Service
 # ============================================================================
 
+@lru_cache(maxsize=1)
 def get_geocoding_service() -> GeocodingService:
     """
-    Get main GeocodingService orchestrator.
+    Get main GeocodingService orchestrator singleton.
     
-    This is the entry point that FastAPI routes depend on.
+    Built once at startup by init_services(), which exposes it to routes via SERVICE.
     Coordinates all other services via constructor injection.
+    Cached so the object graph is built once per process, not per request.
     
     Dependency Graph:
     GeocodingService
@@ -164,6 +201,7 @@ def get_geocoding_service() -> GeocodingService:
     Returns:
         Fully initialized GeocodingService
     """
+    settings = get_settings()
     repo = get_places_repository()
     matcher = get_name_matcher()
     geocoder = get_external_geocoder()
@@ -173,14 +211,54 @@ def get_geocoding_service() -> GeocodingService:
         places_repo=repo,
         name_matcher=matcher,
         external_geocoder=geocoder,
-        directional_parser=parser
+        directional_parser=parser,
+        result_cache_size=settings.result_cache_size,
+        result_cache_ttl_seconds=settings.cache_ttl_days * 86400,
+        batch_concurrency=settings.batch_concurrency
     )
 
 
+# Populated by init_services() at startup. Routes read this directly instead of
+# resolving a Depends() graph per request; tests can monkeypatch it.
+SERVICE: Optional[GeocodingService] = None
+
+
 # ============================================================================
-# Lifespan Management (Optional - for cleanup)
+# Lifespan Management
 # ============================================================================
 
+async def init_services() -> GeocodingService:
+    """
+    Eagerly build all singletons during startup.
+    
+    Keeps connection setup (Supabase, HTTP pool) and regex compilation
+    off the first request's critical path.
+    
+    Returns:
+        Fully initialized GeocodingService (also stored in SERVICE)
+    """
+    global SERVICE
+    
+    logger.info("Initializing services...")
+    
+    await get_supabase_client()
+    get_directional_parser()
+    
+    missing_indexes = await get_places_repository().find_missing_indexes()
+    if missing_indexes:
+        logger.warning(
+            f"places table is missing indexes {missing_indexes}; "
+            "fuzzy/spatial lookups will use sequential scans. Apply db_queries.sql."
+        )
+    
+    # Open the shared, pooled HTTP client for external geocoding
+    await get_external_geocoder().connect()
+    
+    SERVICE = get_geocoding_service()
+    logger.info("Services initialized")
+    return SERVICE
+
+
 async def cleanup_services():
     """
     Cleanup function for graceful shutdown.
@@ -189,18 +267,29 @@ async def cleanup_services():
     """
     logger.info("Cleaning up services...")
     
+    global _redis_cache, _supabase_client, SERVICE
+    SERVICE = None
+    
     # Disconnect Redis
-    global _redis_cache
     if _redis_cache:
         await _redis_cache.disconnect()
         _redis_cache = None
     
+    # Close the shared external geocoder HTTP client
+    if get_external_geocoder.cache_info().currsize:
+        await get_external_geocoder().disconnect()
+    
     # Clear caches
+    get_geocoding_service.cache_clear()
+    get_external_geocoder.cache_clear()
+    get_name_matcher.cache_clear()
+    get_places_repository.cache_clear()
     get_settings.cache_clear()
-    get_supabase_client.cache_clear()
     get_directional_parser.cache_clear()
     
-    # Note: Supabase client doesn't need explicit cleanup
-    # httpx clients in ExternalGeocoder are context-managed
+    # Close the async PostgREST session
+    if _supabase_client:
+        await _supabase_client.postgrest.aclose()
+        _supabase_client = None
     
     logger.info("Cleanup complete")
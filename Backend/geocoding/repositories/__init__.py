@@ -3,5 +3,6 @@ Repository layer for database access.
 """
 
 from .places_repository import PlacesRepository
+from .places_loader import PlacesLoader
 
-__all__ = ['PlacesRepository']
+__all__ = ['PlacesRepository', 'PlacesLoader']
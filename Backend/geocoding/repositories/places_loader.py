@@ -0,0 +1,126 @@
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Union
+from uuid import UUID
+import asyncio
+import logging
+
+from ..services.memory_cache import MemoryCache, MISSING
+
+if TYPE_CHECKING:
+    from .places_repository import PlacesRepository
+
+logger = logging.getLogger(__name__)
+
+
+class PlacesLoader:
+    """
+    DataLoader-style coalescer for place lookups by ID.
+
+    Every load() issued within the same event-loop tick is buffered and
+    resolved by a single batched IN query, so code that walks a
+    hierarchy one place at a time costs one round-trip instead of N.
+
+    Safe to share across requests: buffered IDs live for at most one tick.
+    """
+
+    def __init__(
+        self,
+        repo: "PlacesRepository",
+        cache: Optional[MemoryCache] = None,
+        negative_ttl_seconds: Optional[float] = None
+    ):
+        """
+        Initialize loader.
+
+        Args:
+            repo: Repository used to dispatch batched lookups
+            cache: Optional place cache consulted before, and filled after, each batch
+            negative_ttl_seconds: If set, IDs not found are cached as None for this long
+        """
+        self.repo = repo
+        self.cache = cache
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._dispatch_scheduled = False
+        # Strong references so in-flight batch tasks aren't garbage collected
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+    async def load(self, place_id: Union[UUID, str]) -> Optional[Dict[str, Any]]:
+        """
+        Load a single place, batched with other loads in the same tick.
+
+        Args:
+            place_id: UUID of the place
+
+        Returns:
+            Place dict or None if not found
+        """
+        key = str(place_id)
+
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not MISSING:
+                return cached
+
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._dispatch)
+
+        # Shield so one caller being cancelled doesn't fail the others
+        return await asyncio.shield(future)
+
+    async def load_many(
+        self,
+        place_ids: Iterable[Union[UUID, str]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Load several places in one batch.
+
+        Args:
+            place_ids: Place UUIDs to fetch
+
+        Returns:
+            Place dicts (or None when not found), in input order
+        """
+        return list(await asyncio.gather(*(self.load(pid) for pid in place_ids)))
+
+    def _dispatch(self):
+        """Hand the buffered IDs to a batch task and start a new buffer"""
+        pending = self._pending
+        self._pending = {}
+        self._dispatch_scheduled = False
+
+        task = asyncio.ensure_future(self._resolve(pending))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _resolve(self, pending: Dict[str, asyncio.Future]):
+        """Fetch one batch and settle each waiting future"""
+        logger.debug(f"Coalesced {len(pending)} place lookup(s) into one batch")
+
+        try:
+            # Use the raising variant so a failed batch isn't mistaken for
+            # "not found" (and negatively cached)
+            places = await self.repo._load_by_ids(list(pending))
+        except Exception as e:
+            # Same contract as the repository: log and report "not found",
+            # but leave the cache untouched
+            logger.error(f"Batched place lookup failed: {e}")
+            for future in pending.values():
+                if not future.done():
+                    future.set_result(None)
+            return
+
+        for place_id, future in pending.items():
+            place = places.get(place_id)
+            if self.cache is not None:
+                if place is not None:
+                    self.cache.set(place_id, place)
+                elif self.negative_ttl_seconds is not None:
+                    self.cache.set(place_id, None, ttl_seconds=self.negative_ttl_seconds)
+            if not future.done():
+                future.set_result(place)
@@ -1,23 +1,168 @@
-from typing import List, Optional, Dict, Any, cast
+from typing import List, Optional, Dict, Any, Tuple, Union, AsyncIterator, cast
 from uuid import UUID
-from supabase import Client
+from supabase import AsyncClient, Client
+from postgrest import APIError
+import asyncio
+import httpx
 import logging
-import hashlib
-import json
+import sys
+import unicodedata
 
-from ..services.redis_cache import get_redis_cache
+from ..config import get_settings
+from ..services.redis_cache import get_redis_cache, hashed_key, directional_key
+from ..services.memory_cache import MemoryCache, MISSING
+from ..services.directional_parser import Direction
+from .places_loader import PlacesLoader
 
 logger = logging.getLogger(__name__)
 
+# .in_() filters travel in the URL query string (~37 bytes per UUID), so
+# large ID lists are split into chunks that stay well under common 8 KB
+# URL limits (and under PostgREST's 1000-row response cap), fetched concurrently
+_IN_FILTER_CHUNK_SIZE = 200
+
+# Columns returned by row lookups. The polygon geometry dominates payload size
+# and JSON decode time but isn't needed by the geocoding flow, so it is only
+# fetched when a caller opts in with columns=FULL_COLUMNS.
+DEFAULT_COLUMNS = 'id,name,parent_id,parent_name,hierarchy_level'
+FULL_COLUMNS = '*'
+
+# Upper bound on speculative child fetches in flight, so prefetching can't
+# crowd real queries out of the connection pool
+_MAX_CONCURRENT_PREFETCHES = 16
+
+# Unknown place IDs are remembered briefly so callers iterating a stale ID
+# list don't re-query (and re-log) the same misses
+_PLACE_MISS_TTL_SECONDS = 30
+
+# Fuzzy-search and point-lookup misses (typos, out-of-bounds points) are
+# cached this long, so retried "not found" queries skip the expensive RPC
+_SEARCH_MISS_TTL_SECONDS = 60
+
+# Inputs shorter than a trigram give pg_trgm nothing to probe the GIN index
+# with (it falls back to a sequential scan), so they only get the exact-name
+# lookup; 3-character inputs yield so few trigrams that a low threshold
+# matches a large share of the table, so their threshold is floored
+_MIN_TRIGRAM_QUERY_LENGTH = 3
+_SHORT_QUERY_MIN_THRESHOLD = 0.6
+
+def _canonical_name(name: str) -> str:
+    """
+    Cache-key form of a place name: case-folded, accents stripped, whitespace collapsed.
+    
+    Only combining marks are dropped (so "Multān" -> "multan"); base letters
+    of non-Latin scripts are kept, so distinct Urdu names never collide.
+    """
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+def _effective_threshold(name: str, threshold: float) -> float:
+    """Similarity threshold actually used for a stripped name (see search_by_fuzzy_name)"""
+    if len(name) < _MIN_TRIGRAM_QUERY_LENGTH:
+        # No similarity can exceed 1.0, so search_places_exact_or_fuzzy
+        # skips the trigram fallback and only the exact probe runs
+        return 1.0
+    if len(name) == _MIN_TRIGRAM_QUERY_LENGTH:
+        return max(_SHORT_QUERY_MIN_THRESHOLD, threshold)
+    return threshold
+
+def _compact_place(place: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Intern the parent fields of a row destined for the in-process place cache.
+    
+    Siblings repeat the same parent_id/parent_name, but each decoded row
+    carries its own copies; interning makes cached siblings share one string.
+    """
+    for field in ('parent_id', 'parent_name'):
+        value = place.get(field)
+        if type(value) is str:
+            place[field] = sys.intern(value)
+    return place
+
 class PlacesRepository:
     """
     Repository for database operations on the places table.
-    Provides abstraction over Supabase client with proper type handling.
-    Now includes Redis caching for expensive queries.
+    Provides abstraction over the async Supabase client with proper type handling.
+    Now includes Redis caching for expensive queries, fronted by in-process
+    TTL+LRU caches for the hot read-mostly lookups.
     """
     
-    def __init__(self, supabase_client: Client):
+    def __init__(
+        self,
+        supabase_client: Union[AsyncClient, Client],
+        cache_point_misses: bool = False
+    ):
+        """
+        Initialize repository.
+        
+        Args:
+            supabase_client: Async (or sync, for scripts) Supabase client
+            cache_point_misses: Cache points that fall outside every polygon
+                for the full TTL instead of the short negative TTL
+        """
         self.client = supabase_client
+        self.cache_point_misses = cache_point_misses
+        # Settings are snapshotted at construction (Redis TTLs etc.), like
+        # the rest of the app, which builds its singletons once at startup
+        self._settings = get_settings()
+        # Places are reference data, so repeated lookups within a session are
+        # served from memory; concurrent misses share a single round-trip
+        self._place_cache = MemoryCache(max_size=10_000, ttl_seconds=600)
+        self._fuzzy_cache = MemoryCache(max_size=10_000, ttl_seconds=600)
+        # Points are snapped to a ~1 m grid before lookup, so nearby queries
+        # share entries and this cache sees real hit rates on live traffic
+        self._point_cache = MemoryCache(max_size=50_000, ttl_seconds=600)
+        # Polygon centroids by place ID (static reference data)
+        self._centroid_cache = MemoryCache(max_size=10_000, ttl_seconds=3600)
+        # Directional results are left to Redis; this one never stores
+        # anything and only coalesces concurrent identical RPCs (single-flight)
+        self._directional_flights = MemoryCache(max_size=1, ttl_seconds=0)
+        # Coalesces per-place lookups issued in the same tick into one batch
+        self.loader = PlacesLoader(
+            self,
+            cache=self._place_cache,
+            negative_ttl_seconds=_PLACE_MISS_TTL_SECONDS
+        )
+        # Speculative get_children() tasks started by find_by_coordinates(),
+        # keyed by place ID and consumed by get_children_or_prefetched()
+        self._prefetched_children = MemoryCache(max_size=256, ttl_seconds=30)
+        self._prefetch_semaphore = asyncio.Semaphore(_MAX_CONCURRENT_PREFETCHES)
+        # Sync clients (e.g. from scripts) are supported by running execute()
+        # in a worker thread so the event loop is never blocked
+        self._sync_client = isinstance(supabase_client, Client)
+    
+    async def _execute(self, query: Any) -> Any:
+        """Execute a PostgREST query/RPC builder without blocking the event loop"""
+        if self._sync_client:
+            return await asyncio.to_thread(query.execute)
+        return await query.execute()
+    
+    def clear_memory_caches(self):
+        """Drop all in-process lookup caches (e.g. after a places reload)"""
+        self._place_cache.clear()
+        self._fuzzy_cache.clear()
+        self._point_cache.clear()
+        self._centroid_cache.clear()
+    
+    async def find_missing_indexes(self) -> List[str]:
+        """
+        Report which indexes backing the places RPCs are missing.
+        
+        Without them fuzzy search and point lookups fall back to
+        sequential scans. Intended as a startup sanity check.
+        
+        Returns:
+            Names of missing indexes (empty if all present or the check is unavailable)
+        """
+        try:
+            result = await self._execute(self.client.rpc('places_missing_indexes', {}))
+            if result.data and isinstance(result.data, list):
+                return [row['indexname'] for row in result.data if isinstance(row, dict)]
+            return []
+        except Exception as e:
+            logger.warning(f"Could not verify places indexes (apply db_queries.sql?): {e}")
+            return []
     
     async def search_by_fuzzy_name(
         self, 
@@ -26,9 +171,15 @@ class PlacesRepository:
     ) -> List[Dict[str, Any]]:
         """
         Search places using fuzzy name matching via PostgreSQL function.
-        Uses trigram similarity for efficient fuzzy matching.
+        Uses trigram similarity for efficient fuzzy matching; exact
+        (case-insensitive) names short-circuit it with similarity 1.0.
         NOW WITH REDIS CACHING.
         
+        Names shorter than 3 characters are matched exactly only: with no
+        extractable trigrams pg_trgm would fall back to a sequential scan,
+        which is exactly the cost we want to avoid. 3-character names use
+        a threshold of at least 0.6 to keep the index scan selective.
+        
         Args:
             name: Location name to search for
             threshold: Minimum similarity score (0-1)
@@ -36,44 +187,174 @@ class PlacesRepository:
         Returns:
             List of matching places with similarity scores
         """
-        # Try Redis cache first
+        name = name.strip()
+        if not name:
+            return []
+        threshold = _effective_threshold(name, threshold)
+        
+        try:
+            # Errors propagate out of get_or_load uncached, so only genuine
+            # misses are negatively cached
+            # Equivalent spellings ("Multan", " multan", "Multān") share a slot
+            key = (_canonical_name(name), f"{threshold:.2f}")
+            return await self._fuzzy_cache.get_or_load(
+                key,
+                lambda: self._search_by_fuzzy_name_uncached(name, threshold, key),
+                cache_if=bool,
+                negative_ttl_seconds=_SEARCH_MISS_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.error(f"Fuzzy search failed for '{name}': {e}")
+            return []
+    
+    async def _search_by_fuzzy_name_uncached(
+        self, 
+        name: str, 
+        threshold: float,
+        key: Tuple[str, str]
+    ) -> List[Dict[str, Any]]:
+        """Fuzzy search via Redis/Supabase, bypassing the in-process cache (raises on errors)"""
+        # Try Redis cache first, under the same canonical (name, threshold) key
         cache = get_redis_cache()
         if cache:
-            cache_key = f"fuzzy:{name}:{threshold}"
+            cache_key = hashed_key(*key)
             cached_result = await cache.get("fuzzy_search", cache_key)
             if cached_result is not None:
                 return cached_result
         
+        # Exact (case-insensitive) B-tree probe first, trigram search only
+        # when nothing matches exactly; both happen in this one call
+        query = self.client.rpc(
+            'search_places_exact_or_fuzzy',
+            {
+                'search_name': name,
+                'similarity_threshold': threshold
+            }
+        )
+        result = await self._execute(query)
+        
+        # Type guard: ensure result.data is a list
+        data: List[Dict[str, Any]] = []
+        if result.data and isinstance(result.data, list):
+            data = cast(List[Dict[str, Any]], result.data)
+        
+        # Cache the result; misses too, but only briefly
+        if cache:
+            ttl_fuzzy = self._settings.redis_ttl_fuzzy
+            ttl = ttl_fuzzy if data else min(ttl_fuzzy, _SEARCH_MISS_TTL_SECONDS)
+            await cache.set("fuzzy_search", cache_key, data, ttl_seconds=ttl)
+        
+        return data
+    
+    async def search_by_fuzzy_names_batch(
+        self,
+        names: List[str],
+        threshold: float = 0.85
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fuzzy search for several names with one database round-trip.
+        
+        Same per-name semantics and caches as search_by_fuzzy_name: names
+        already in memory are served from there, the rest from one Redis
+        MGET, and only the remainder go to a single
+        search_places_exact_or_fuzzy_batch RPC.
+        
+        Args:
+            names: Location names to search for
+            threshold: Minimum similarity score (0-1)
+            
+        Returns:
+            Dict mapping each (stripped) name to its matching places;
+            empty list for names without matches or on errors
+        """
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        # Cache key -> input names sharing it; each key is searched once
+        pending: Dict[Tuple[str, str], List[str]] = {}
+        for name in dict.fromkeys(n.strip() for n in names):
+            if not name:
+                continue
+            key = (_canonical_name(name), f"{_effective_threshold(name, threshold):.2f}")
+            cached = self._fuzzy_cache.get(key)
+            if cached is MISSING:
+                pending.setdefault(key, []).append(name)
+            else:
+                results[name] = cached
+        
+        if not pending:
+            return results
+        
         try:
-            result = self.client.rpc(
-                'search_places_fuzzy',
-                {
-                    'search_name': name,
-                    'similarity_threshold': threshold
-                }
-            ).execute()
+            cache = get_redis_cache()
+            if cache:
+                redis_keys = {key: hashed_key(*key) for key in pending}
+                redis_hits = await cache.get_many("fuzzy_search", list(redis_keys.values()))
+                for key in list(pending):
+                    cached = redis_hits.get(redis_keys[key])
+                    if cached is not None:
+                        self._cache_search_result(key, cached)
+                        for name in pending.pop(key):
+                            results[name] = cached
             
-            # Type guard: ensure result.data is a list
-            if result.data and isinstance(result.data, list):
-                data = cast(List[Dict[str, Any]], result.data)
+            if pending:
+                fetched = await self._search_by_fuzzy_names_uncached(pending)
+                for key, data in fetched.items():
+                    self._cache_search_result(key, data)
+                    for name in pending[key]:
+                        results[name] = data
                 
-                # Cache the result
                 if cache:
-                    from ..config import get_settings
-                    settings = get_settings()
-                    cache_key = f"fuzzy:{name}:{threshold}"
-                    await cache.set("fuzzy_search", cache_key, data, ttl_seconds=settings.redis_ttl_fuzzy)
-                
-                return data
-            return []
+                    ttl_fuzzy = self._settings.redis_ttl_fuzzy
+                    hits = {redis_keys[key]: data for key, data in fetched.items() if data}
+                    misses = {redis_keys[key]: data for key, data in fetched.items() if not data}
+                    await cache.set_many("fuzzy_search", hits, ttl_seconds=ttl_fuzzy)
+                    await cache.set_many(
+                        "fuzzy_search", misses,
+                        ttl_seconds=min(ttl_fuzzy, _SEARCH_MISS_TTL_SECONDS)
+                    )
         except Exception as e:
-            logger.error(f"Fuzzy search failed for '{name}': {e}")
-            return []
+            logger.error(f"Batch fuzzy search failed for {len(pending)} name(s): {e}")
+        
+        for names_for_key in pending.values():
+            for name in names_for_key:
+                results.setdefault(name, [])
+        return results
+    
+    async def _search_by_fuzzy_names_uncached(
+        self,
+        pending: Dict[Tuple[str, str], List[str]]
+    ) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """One batched exact-or-fuzzy RPC, searching the first name of each cache key (raises on errors)"""
+        key_by_name = {names[0]: key for key, names in pending.items()}
+        query = self.client.rpc(
+            'search_places_exact_or_fuzzy_batch',
+            {
+                'search_names': list(key_by_name),
+                # The key carries each name's effective threshold
+                'similarity_thresholds': [float(key[1]) for key in key_by_name.values()]
+            }
+        )
+        result = await self._execute(query)
+        
+        fetched: Dict[Tuple[str, str], List[Dict[str, Any]]] = {key: [] for key in pending}
+        if result.data and isinstance(result.data, list):
+            for row in result.data:
+                key = key_by_name.get(row.pop('query', None))
+                if key is not None:
+                    fetched[key].append(row)
+        return fetched
+    
+    def _cache_search_result(self, key: Tuple[str, str], data: List[Dict[str, Any]]):
+        """Store a fuzzy-search result in memory (misses only briefly)"""
+        if data:
+            self._fuzzy_cache.set(key, data)
+        else:
+            self._fuzzy_cache.set(key, data, ttl_seconds=_SEARCH_MISS_TTL_SECONDS)
     
     async def find_by_coordinates(
         self, 
         longitude: float, 
-        latitude: float
+        latitude: float,
+        prefetch_children: bool = False
     ) -> Optional[Dict[str, Any]]:
         """
         Find place containing a point using PostGIS ST_Contains.
@@ -82,73 +363,167 @@ class PlacesRepository:
         Args:
             longitude: Longitude coordinate
             latitude: Latitude coordinate
+            prefetch_children: Start fetching the place's children in the
+                background; collect them with get_children_or_prefetched()
             
         Returns:
             Place dict or None if no match found
         """
+        # Snap to 5 decimal places (~1 m): raw GPS floats rarely repeat exactly,
+        # and polygons are far wider than the rounding error
+        longitude, latitude = round(longitude, 5), round(latitude, 5)
         try:
-            result = self.client.rpc(
-                'find_place_by_point',
-                {'lon': longitude, 'lat': latitude}
-            ).execute()
-            
-            # Type guard: ensure result.data is a list and return first element
-            if result.data and isinstance(result.data, list) and len(result.data) > 0:
-                return cast(Dict[str, Any], result.data[0])
-            return None
+            place = await self._point_cache.get_or_load(
+                (longitude, latitude),
+                lambda: self._find_by_coordinates_uncached(longitude, latitude),
+                cache_if=lambda found: self.cache_point_misses or found is not None,
+                negative_ttl_seconds=_SEARCH_MISS_TTL_SECONDS
+            )
         except Exception as e:
             logger.error(f"Point lookup failed for ({longitude}, {latitude}): {e}")
             return None
+        
+        if prefetch_children and place:
+            self._prefetch_children(str(place['id']))
+        
+        return place
     
-    async def get_by_id(self, place_id: UUID) -> Optional[Dict[str, Any]]:
+    def _prefetch_children(self, place_id: str):
+        """Schedule a background get_children() for place_id unless one is pending or the cap is hit"""
+        if self._prefetch_semaphore.locked():
+            return
+        if self._prefetched_children.get(place_id) is not MISSING:
+            return
+        
+        async def prefetch() -> List[Dict[str, Any]]:
+            async with self._prefetch_semaphore:
+                return await self.get_children(place_id)
+        
+        self._prefetched_children.set(place_id, asyncio.create_task(prefetch()))
+    
+    async def get_children_or_prefetched(self, parent_id: UUID) -> List[Dict[str, Any]]:
+        """
+        Get the first page of children, reusing a prefetch if one was started.
+        
+        Args:
+            parent_id: UUID of parent place
+            
+        Returns:
+            List of child places (same as get_children with default arguments)
+        """
+        key = str(parent_id)
+        task = self._prefetched_children.get(key)
+        if task is not MISSING:
+            self._prefetched_children.delete(key)
+            return await task
+        return await self.get_children(parent_id)
+    
+    async def _find_by_coordinates_uncached(
+        self, 
+        longitude: float, 
+        latitude: float
+    ) -> Optional[Dict[str, Any]]:
+        """Point-in-polygon lookup via Supabase, bypassing the in-process cache (raises on errors)"""
+        query = self.client.rpc(
+            'find_place_by_point',
+            {'lon': longitude, 'lat': latitude}
+        )
+        result = await self._execute(query)
+        
+        # Type guard: ensure result.data is a list and return first element
+        if result.data and isinstance(result.data, list) and len(result.data) > 0:
+            return cast(Dict[str, Any], result.data[0])
+        return None
+    
+    async def get_by_id(
+        self, 
+        place_id: UUID, 
+        columns: str = DEFAULT_COLUMNS
+    ) -> Optional[Dict[str, Any]]:
         """
         Get place by ID.
         
         Args:
             place_id: UUID of the place
+            columns: Comma-separated columns to select (only DEFAULT_COLUMNS is cached)
             
         Returns:
             Place dict or None if not found
         """
+        place_id_str = str(place_id)
         try:
-            result = self.client.table('places')\
-                .select('*')\
-                .eq('id', str(place_id))\
-                .single()\
-                .execute()
+            if columns != DEFAULT_COLUMNS:
+                return await self._get_by_id_uncached(place_id_str, columns)
             
-            # Type guard for single result
-            if result.data and isinstance(result.data, dict):
-                return cast(Dict[str, Any], result.data)
-            return None
+            # Errors propagate out of get_or_load uncached, so only genuine
+            # "not found" results are negatively cached
+            return await self._place_cache.get_or_load(
+                place_id_str,
+                lambda: self._get_by_id_uncached(place_id_str, columns),
+                negative_ttl_seconds=_PLACE_MISS_TTL_SECONDS
+            )
         except Exception as e:
             logger.error(f"Get by ID failed for {place_id}: {e}")
             return None
     
+    async def _get_by_id_uncached(
+        self, 
+        place_id: str, 
+        columns: str
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch a place row from Supabase, bypassing the in-process cache (raises on errors)"""
+        query = self.client.table('places')\
+            .select(columns)\
+            .eq('id', place_id)\
+            .maybe_single()
+        result = await self._execute(query)
+        
+        # A missing row is a normal empty result, not an error; older
+        # postgrest clients return None instead of an empty response
+        if result is not None and result.data and isinstance(result.data, dict):
+            place = cast(Dict[str, Any], result.data)
+            return _compact_place(place) if columns == DEFAULT_COLUMNS else place
+        return None
+    
     async def get_children(
         self, 
         parent_id: UUID, 
-        level: Optional[int] = None
+        level: Optional[int] = None,
+        columns: str = DEFAULT_COLUMNS,
+        *,
+        limit: int = 500,
+        after_id: Optional[Union[UUID, str]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Get all children of a place, optionally filtered by hierarchy level.
+        Get one page of children of a place, optionally filtered by hierarchy level.
+        
+        Uses keyset pagination on id: pass the last id of a page as after_id
+        to fetch the next one. Use iter_children() to walk all pages.
         
         Args:
             parent_id: UUID of parent place
             level: Optional hierarchy level to filter by
+            columns: Comma-separated columns to select (must include id)
+            limit: Maximum number of children to return
+            after_id: Only return children with id greater than this
             
         Returns:
-            List of child places
+            List of child places, ordered by id
         """
         try:
             query = self.client.table('places')\
-                .select('*')\
+                .select(columns)\
                 .eq('parent_id', str(parent_id))
             
             if level is not None:
                 query = query.eq('hierarchy_level', level)
             
-            result = query.execute()
+            if after_id is not None:
+                query = query.gt('id', str(after_id))
+            
+            query = query.order('id').limit(limit)
+            
+            result = await self._execute(query)
             
             # Type guard: ensure result.data is a list
             if result.data and isinstance(result.data, list):
@@ -158,10 +533,108 @@ class PlacesRepository:
             logger.error(f"Get children failed for {parent_id}: {e}")
             return []
     
+    async def iter_children(
+        self, 
+        parent_id: UUID, 
+        level: Optional[int] = None,
+        columns: str = DEFAULT_COLUMNS,
+        page_size: int = 500
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over all children of a place, one page at a time.
+        
+        Peak memory is bounded by page_size regardless of how many
+        children the parent has.
+        
+        Args:
+            parent_id: UUID of parent place
+            level: Optional hierarchy level to filter by
+            columns: Comma-separated columns to select (must include id)
+            page_size: Number of children fetched per query
+            
+        Yields:
+            Child place dicts, ordered by id
+        """
+        after_id = None
+        while True:
+            page = await self.get_children(
+                parent_id,
+                level,
+                columns,
+                limit=page_size,
+                after_id=after_id
+            )
+            for child in page:
+                yield child
+            
+            if len(page) < page_size:
+                return
+            after_id = page[-1]['id']
+    
+    async def get_subtree(
+        self, 
+        root_id: UUID, 
+        depth: int = 2
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a place and all its descendants up to depth levels below it.
+        
+        Uses one recursive-CTE RPC, so walking D levels costs one round-trip
+        instead of a get_children call per level (and per parent).
+        
+        Args:
+            root_id: UUID of the root place
+            depth: Number of levels below the root to include
+            
+        Returns:
+            List of places (DEFAULT_COLUMNS plus 'depth', 0 for the root),
+            ordered by depth
+        """
+        try:
+            query = self.client.rpc(
+                'get_subtree',
+                {'root': str(root_id), 'max_depth': depth}
+            )
+            result = await self._execute(query)
+            
+            if result.data and isinstance(result.data, list):
+                return cast(List[Dict[str, Any]], result.data)
+            return []
+        except Exception as e:
+            logger.error(f"Get subtree failed for {root_id}: {e}")
+            return []
+    
+    async def get_place_bundle(self, place_id: UUID) -> Dict[str, Any]:
+        """
+        Get a place together with its children and child count.
+        
+        Preferred over calling get_by_id, get_children and get_children_count
+        one after another: the three lookups run concurrently, and the place
+        itself goes through the loader so concurrent bundles share one
+        batched query.
+        
+        Args:
+            place_id: UUID of the place
+            
+        Returns:
+            Dict with 'place' (dict or None), 'children' (first page of
+            get_children) and 'children_count' (int, total) keys
+        """
+        place, children, children_count = await asyncio.gather(
+            self.loader.load(place_id),
+            self.get_children(place_id),
+            self.get_children_count(place_id)
+        )
+        return {
+            'place': place,
+            'children': children,
+            'children_count': children_count
+        }
+    
     async def find_places_in_direction(
     self,
-    base_place_ids: List[UUID],
-    direction: str
+    base_place_ids: List[Union[UUID, str]],
+    direction: Union[Direction, str]
     ) -> List[Dict[str, Any]]:
         """
         Find all places in a directional region using PostgreSQL function.
@@ -169,65 +642,129 @@ class PlacesRepository:
         
         Args:
             base_place_ids: Base place IDs defining the region
-            direction: Directional indicator (e.g., 'north', 'central')
+            direction: Direction, or its value (e.g., 'north', 'central')
             
         Returns:
             List of places in the directional grid intersection
         """
+        # Enum values are already the lowercase RPC argument
+        direction = direction.value if isinstance(direction, Direction) else direction.lower()
+        
+        # Stringify (and canonicalize) the IDs once; the same tuple serves as
+        # coalescing key, Redis key input and RPC argument
+        id_strs = tuple(sorted(set(map(str, base_place_ids))))
+        
+        # Concurrent callers for the same region await one RPC instead of
+        # each missing Redis and querying Supabase (thundering herd)
+        return await self._directional_flights.get_or_load(
+            (id_strs, direction),
+            lambda: self._find_places_in_direction_uncached(id_strs, direction),
+            cache_if=lambda _: False
+        )
+    
+    async def _find_places_in_direction_uncached(
+        self,
+        base_place_ids: Tuple[str, ...],
+        direction: str
+    ) -> List[Dict[str, Any]]:
+        """Directional search via Redis/Supabase for sorted, de-duplicated string IDs and a lowercase direction"""
         # Try Redis cache first
         cache = get_redis_cache()
         if cache:
-            # Sort IDs for consistent cache key
-            sorted_ids = sorted(str(pid) for pid in base_place_ids)
-            cache_key = f"{','.join(sorted_ids)}:{direction}"
+            # Order-insensitive, fixed-length key over IDs + direction
+            cache_key = directional_key(base_place_ids, direction)
             
             cached_result = await cache.get("directional", cache_key)
             if cached_result is not None:
-                logger.info(f"✅ Directional cache HIT: {direction} ({len(cached_result)} places)")
+                logger.debug(f"✅ Directional cache HIT: {direction} ({len(cached_result)} places)")
                 return cached_result
         
         try:
-            logger.info(f"Calling find_places_in_direction with ids: {base_place_ids}, direction: {direction}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Calling find_places_in_direction with ids: {base_place_ids}, direction: {direction}")
             
-            result = self.client.rpc(
+            query = self.client.rpc(
                 'find_places_in_direction',
                 {
-                    'base_place_ids': [str(pid) for pid in base_place_ids],
-                    'direction': direction.lower()
+                    'base_place_ids': list(base_place_ids),
+                    'direction': direction
                 }
-            ).execute()
+            )
+            result = await self._execute(query)
             
             # Type guard: ensure result.data is a list
             if result.data and isinstance(result.data, list):
-                # DEBUG LOGGING (safe after type check)
-                logger.info(f"RPC result.data type: {type(result.data)}")
-                data_list = cast(List[Any], result.data)
-                logger.info(f"First 3 items: {data_list[:3]}")
-                if len(data_list) > 0:
-                    first_item = data_list[0]
-                    logger.info(f"First item type: {type(first_item)}")
-                    logger.info(f"First item: {first_item}")
-                    if isinstance(first_item, dict):
-                        logger.info(f"First item keys: {first_item.keys()}")
+                result_data = cast(List[Dict[str, Any]], result.data)
                 
-                result_data = cast(List[Dict[str, Any]], data_list)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Directional RPC returned {len(result_data)} places, first: {result_data[0]}")
                 
                 # Cache the result
                 if cache:
-                    from ..config import get_settings
-                    settings = get_settings()
-                    sorted_ids = sorted(str(pid) for pid in base_place_ids)
-                    cache_key = f"{','.join(sorted_ids)}:{direction}"
-                    await cache.set("directional", cache_key, result_data, ttl_seconds=settings.redis_ttl_directional)
-                    logger.info(f"💾 Directional cache SET: {direction} ({len(result_data)} places)")
+                    await cache.set("directional", cache_key, result_data, ttl_seconds=self._settings.redis_ttl_directional)
+                    logger.debug(f"💾 Directional cache SET: {direction} ({len(result_data)} places)")
                 
                 return result_data
             return []
-        except Exception as e:
+        except (httpx.HTTPError, APIError) as e:
+            # Expected transport/PostgREST failures: no traceback needed
             logger.error(f"Directional search failed for {direction}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
             return []
+        except Exception:
+            logger.exception(f"Unexpected error in directional search for {direction}")
+            return []
+    
+    async def resolve_location(
+        self,
+        name: str,
+        threshold: float = 0.85,
+        longitude: Optional[float] = None,
+        latitude: Optional[float] = None,
+        direction: Optional[str] = None,
+        similarity_tolerance: float = 0.05
+    ) -> Dict[str, Any]:
+        """
+        Fuzzy search, point lookup and directional search in one round-trip.
+        
+        Fuses what would otherwise be serial search_by_fuzzy_name,
+        find_by_coordinates and find_places_in_direction calls into the
+        resolve_location RPC. The directional part uses the best fuzzy
+        candidate as its base region.
+        
+        Args:
+            name: Location name to search for
+            threshold: Minimum similarity score (0-1)
+            longitude: Optional longitude for point-in-polygon lookup
+            latitude: Optional latitude for point-in-polygon lookup
+            direction: Optional directional indicator (e.g., 'north', 'central')
+            similarity_tolerance: Score difference within which more specific
+                candidates are preferred as the directional base
+            
+        Returns:
+            Dict with 'fuzzy' (candidates), 'point' (place or None) and
+            'directional' (places) keys
+        """
+        empty: Dict[str, Any] = {'fuzzy': [], 'point': None, 'directional': []}
+        try:
+            query = self.client.rpc(
+                'resolve_location',
+                {
+                    'search_name': name,
+                    'similarity_threshold': threshold,
+                    'lon': longitude,
+                    'lat': latitude,
+                    'direction': direction,
+                    'similarity_tolerance': similarity_tolerance
+                }
+            )
+            result = await self._execute(query)
+            
+            if result.data and isinstance(result.data, dict):
+                return {**empty, **cast(Dict[str, Any], result.data)}
+            return empty
+        except Exception as e:
+            logger.error(f"Resolve location failed for '{name}': {e}")
+            return empty
     
     async def get_children_count(self, parent_id: UUID) -> int:
         """
@@ -240,31 +777,30 @@ class PlacesRepository:
             Count of direct children
         """
         try:
-            result = self.client.table('places')\
-                .select('id')\
-                .eq('parent_id', str(parent_id))\
-                .execute()
+            # head=True returns only the count header, no rows
+            query = self.client.table('places')\
+                .select('id', count='exact', head=True)\
+                .eq('parent_id', str(parent_id))
+            result = await self._execute(query)
             
-            # Count result rows
-            if result.data and isinstance(result.data, list):
-                return len(result.data)
-            return 0
+            return result.count or 0
         except Exception as e:
             logger.error(f"Get children count failed for {parent_id}: {e}")
             return 0
     
     async def get_children_counts_batch(
         self, 
-        parent_ids: List[UUID]
+        parent_ids: List[Union[UUID, str]]
     ) -> Dict[str, int]:
         """
         Batch get children counts for multiple parents.
         
         More efficient than calling get_children_count multiple times.
-        Uses a single query.
+        Uses a single RPC that counts with GROUP BY in Postgres, so one
+        row comes back per parent rather than one per child.
         
         Args:
-            parent_ids: List of parent UUIDs
+            parent_ids: List of parent UUIDs (or their string forms)
             
         Returns:
             Dict mapping parent_id (as string) to child count
@@ -273,34 +809,39 @@ class PlacesRepository:
             return {}
         
         try:
-            result = self.client.table('places')\
-                .select('parent_id')\
-                .in_('parent_id', [str(pid) for pid in parent_ids])\
-                .execute()
+            query = self.client.rpc(
+                'children_counts',
+                {'parent_ids': list(map(str, parent_ids))}
+            )
+            result = await self._execute(query)
             
-            # Count occurrences of each parent_id
-            counts: Dict[str, int] = {}
             if result.data and isinstance(result.data, list):
-                for row in result.data:
-                    if isinstance(row, dict):
-                        parent = row.get('parent_id')
-                        if parent and isinstance(parent, str):
-                            counts[parent] = counts.get(parent, 0) + 1
-            
-            return counts
+                return {
+                    str(row['parent_id']): int(row['c'])
+                    for row in result.data
+                    if isinstance(row, dict) and row.get('parent_id')
+                }
+            return {}
         except Exception as e:
             logger.error(f"Batch children count failed: {e}")
             return {}
     
-    async def get_by_ids_batch(self, place_ids: List[UUID]) -> Dict[str, Dict[str, Any]]:
+    async def get_by_ids_batch(
+        self, 
+        place_ids: List[Union[UUID, str]], 
+        columns: str = DEFAULT_COLUMNS
+    ) -> Dict[str, Dict[str, Any]]:
         """
         Batch get places by IDs.
         
         Much more efficient than calling get_by_id multiple times.
-        Uses a single query with .in_() filter.
+        IDs already in the place cache are served from memory, then from
+        Redis in one MGET; the rest use a single query with .in_() filter
+        per chunk of _IN_FILTER_CHUNK_SIZE IDs, fetched concurrently.
         
         Args:
-            place_ids: List of place UUIDs to fetch
+            place_ids: List of place UUIDs (or their string forms) to fetch
+            columns: Comma-separated columns to select (must include id)
             
         Returns:
             Dict mapping place_id (as string) to place data
@@ -308,20 +849,179 @@ class PlacesRepository:
         if not place_ids:
             return {}
         
+        if columns != DEFAULT_COLUMNS:
+            try:
+                return await self._fetch_by_ids(place_ids, columns)
+            except Exception as e:
+                logger.error(f"Batch get by IDs failed: {e}")
+                return {}
+        
+        # Serve what we can from the place cache (refreshing LRU order) and
+        # only query for the rest
+        places_dict: Dict[str, Dict[str, Any]] = {}
+        missing_ids: List[str] = []
+        # Stringify each ID once, dropping duplicates so they aren't re-queried
+        for place_id in dict.fromkeys(map(str, place_ids)):
+            cached = self._place_cache.get(place_id)
+            if cached is MISSING:
+                missing_ids.append(place_id)
+            elif cached is not None:
+                places_dict[place_id] = cached
+        
+        if not missing_ids:
+            return places_dict
+        
+        try:
+            fetched = await self._load_by_ids(missing_ids)
+        except Exception as e:
+            logger.error(f"Batch get by IDs failed: {e}")
+            return places_dict
+        
+        for place_id, place in fetched.items():
+            self._place_cache.set(place_id, place)
+        places_dict.update(fetched)
+        return places_dict
+    
+    async def get_centroids(
+        self,
+        place_ids: List[Union[UUID, str]]
+    ) -> Dict[str, Tuple[float, float]]:
+        """
+        Batch get polygon centroids for places.
+        
+        Centroids already in memory are served from the centroid cache;
+        the rest come from one place_centroids RPC.
+        
+        Args:
+            place_ids: List of place UUIDs (or their string forms)
+            
+        Returns:
+            Dict mapping place_id (as string) to (longitude, latitude);
+            places without a polygon are omitted
+        """
+        centroids: Dict[str, Tuple[float, float]] = {}
+        missing_ids: List[str] = []
+        for place_id in dict.fromkeys(map(str, place_ids)):
+            cached = self._centroid_cache.get(place_id)
+            if cached is MISSING:
+                missing_ids.append(place_id)
+            else:
+                centroids[place_id] = cached
+        
+        if not missing_ids:
+            return centroids
+        
         try:
-            result = self.client.table('places')\
-                .select('*')\
-                .in_('id', [str(pid) for pid in place_ids])\
-                .execute()
+            result = await self._execute(
+                self.client.rpc('place_centroids', {'place_ids': missing_ids})
+            )
+            if result.data and isinstance(result.data, list):
+                for row in result.data:
+                    if isinstance(row, dict) and row.get('lon') is not None and row.get('lat') is not None:
+                        place_id = str(row['id'])
+                        centroid = (float(row['lon']), float(row['lat']))
+                        self._centroid_cache.set(place_id, centroid)
+                        centroids[place_id] = centroid
+        except Exception as e:
+            logger.error(f"Get centroids failed: {e}")
+        
+        return centroids
+    
+    async def get_ancestors_and_children_counts(
+        self,
+        place_ids: List[Union[UUID, str]]
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+        """
+        Get places, all of their ancestors, and each one's direct-children count.
+        
+        One recursive-CTE RPC walks every level up to the root, so
+        multi-level aggregation (tehsil -> district -> province) costs one
+        round-trip in total instead of a lookup and a count per level.
+        Fetched places also warm the place cache.
+        
+        Args:
+            place_ids: List of place UUIDs (or their string forms)
             
-            # Build lookup dict
-            places_dict: Dict[str, Dict[str, Any]] = {}
+        Returns:
+            (places by ID, children counts by ID), both keyed by string ID
+        """
+        if not place_ids:
+            return {}, {}
+        
+        try:
+            query = self.client.rpc(
+                'ancestors_with_children_counts',
+                {'place_ids': list(dict.fromkeys(map(str, place_ids)))}
+            )
+            result = await self._execute(query)
+        except Exception as e:
+            logger.error(f"Get ancestors failed: {e}")
+            return {}, {}
+        
+        places: Dict[str, Dict[str, Any]] = {}
+        counts: Dict[str, int] = {}
+        if result.data and isinstance(result.data, list):
+            for row in result.data:
+                if not isinstance(row, dict) or not row.get('id'):
+                    continue
+                place_id = str(row['id'])
+                counts[place_id] = int(row.pop('children_count', 0) or 0)
+                place = _compact_place(row)
+                self._place_cache.set(place_id, place)
+                places[place_id] = place
+        return places, counts
+    
+    async def _load_by_ids(self, place_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load DEFAULT_COLUMNS place rows from Redis, then Supabase for the rest.
+        
+        Redis lookups and writes are each one pipelined round-trip regardless
+        of batch size. Raises on database errors (Redis errors degrade to misses).
+        Rows are compacted for the in-process place cache.
+        """
+        cache = get_redis_cache()
+        if not cache:
+            places_dict = await self._fetch_by_ids(place_ids)
+        else:
+            places_dict = await cache.get_many("place_by_id", place_ids)
+            missing_ids = [pid for pid in place_ids if pid not in places_dict]
+            if missing_ids:
+                fetched = await self._fetch_by_ids(missing_ids)
+                if fetched:
+                    await cache.set_many("place_by_id", fetched, ttl_seconds=self._settings.redis_ttl_place)
+                places_dict.update(fetched)
+        
+        for place in places_dict.values():
+            _compact_place(place)
+        return places_dict
+    
+    async def _fetch_by_ids(
+        self, 
+        place_ids: List[Union[UUID, str]], 
+        columns: str = DEFAULT_COLUMNS
+    ) -> Dict[str, Dict[str, Any]]:
+        """get_by_ids_batch without error handling; raises on query failure"""
+        ids = list(map(str, place_ids))
+        chunks = [
+            ids[i:i + _IN_FILTER_CHUNK_SIZE]
+            for i in range(0, len(ids), _IN_FILTER_CHUNK_SIZE)
+        ]
+        
+        results = await asyncio.gather(*(
+            self._execute(
+                self.client.table('places')
+                .select(columns)
+                .in_('id', chunk)
+            )
+            for chunk in chunks
+        ))
+        
+        # Build lookup dict
+        places_dict: Dict[str, Dict[str, Any]] = {}
+        for result in results:
             if result.data and isinstance(result.data, list):
                 for place in result.data:
                     if isinstance(place, dict) and 'id' in place:
                         places_dict[str(place['id'])] = place
-            
-            return places_dict
-        except Exception as e:
-            logger.error(f"Batch get by IDs failed: {e}")
-            return {}
\ No newline at end of file
+        
+        return places_dict
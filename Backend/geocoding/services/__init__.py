@@ -6,7 +6,8 @@ from .geocoding_service import GeocodingService
 from .name_matcher import NameMatcher
 from .external_geocoder import ExternalGeocoder
 from .directional_parser import DirectionalParser, Direction
-from .redis_cache import RedisCache, get_redis_cache, set_redis_cache
+from .redis_cache import RedisCache, get_redis_cache, set_redis_cache, hashed_key, directional_key
+from .memory_cache import MemoryCache
 
 __all__ = [
     'GeocodingService',
@@ -16,5 +17,8 @@ __all__ = [
     'Direction',
     'RedisCache',
     'get_redis_cache',
-    'set_redis_cache'
+    'set_redis_cache',
+    'hashed_key',
+    'directional_key',
+    'MemoryCache'
 ]
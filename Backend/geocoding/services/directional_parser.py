@@ -1,5 +1,5 @@
 import re
-from typing import Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 from enum import Enum
 from functools import lru_cache
 
@@ -31,9 +31,13 @@ class DirectionalParser:
     
     Optimizations:
     - Pre-compiled regex patterns for O(1) pattern lookup
-    - LRU cache for repeated parse operations
+    - LRU cache for repeated parse operations, keyed on normalized input
+      (lowercased, whitespace collapsed) so trivial variants share one entry
+    - Cache lives at module scope, keyed on the string alone (it doesn't
+      pin parser instances, and is shared by all of them)
     - Compound directions checked before simple ones (priority order)
-    - Single-pass regex matching
+    - Single-pass regex matching (one fused alternation, not one search per direction)
+    - Literal-stem prefilter skips the fused pattern for direction-free input
     """
     
     # Pre-compile regex patterns for better performance (O(1) lookup)
@@ -50,11 +54,29 @@ class DirectionalParser:
         (Direction.CENTRAL, re.compile(r'\b(central|middle)\b', re.IGNORECASE)),
     ]
     
-    @lru_cache(maxsize=256)
+    # All direction patterns fused into one alternation (same priority order),
+    # one named group per entry, so each string is scanned once instead of once
+    # per direction. Group name -> index into _DIRECTION_PATTERNS.
+    _COMBINED_PATTERN = re.compile(
+        '|'.join(f'(?P<d{i}>{pattern.pattern})' for i, (_, pattern) in enumerate(_DIRECTION_PATTERNS)),
+        re.IGNORECASE
+    )
+    _GROUP_PRIORITY = {f'd{i}': i for i in range(len(_DIRECTION_PATTERNS))}
+    
+    # Cheap prefilter over normalized (lowercase) input: every direction word
+    # contains one of these stems, so if none occurs the fused pattern can't
+    # match. Most queries are bare place names and stop here.
+    _DIRECTION_HINT = re.compile(r'north|south|east|west|central|middle')
+    
     def parse(self, location_string: str) -> Tuple[Optional[Direction], Tuple[str, ...]]:
         """
         Parse directional description into direction and single place name.
         
+        Input is normalized (lowercased, whitespace collapsed) before the
+        cached parse, so "Central Sindh" and " central  SINDH " share one
+        cache entry. Returned place names are therefore lowercase; name
+        matching downstream is case-insensitive.
+        
         Time Complexity: O(n) where n is string length (single-pass regex)
         Space Complexity: O(1) - returns single place name
         
@@ -62,41 +84,67 @@ class DirectionalParser:
             location_string: Raw location text (e.g., "Central Sindh")
             
         Returns:
-            (direction, (place_name,)) or (None, (location_string,)) if no direction found
+            (direction, (place_name,)) or (None, (place_name,)) if no direction found
             Returns tuple for caching compatibility
         
         Examples:
-            "Central Sindh" -> (Direction.CENTRAL, ("Sindh",))
-            "North-Eastern KPK" -> (Direction.NORTHEAST, ("KPK",))
-            "Islamabad" -> (None, ("Islamabad",))
+            "Central Sindh" -> (Direction.CENTRAL, ("sindh",))
+            "North-Eastern KPK" -> (Direction.NORTHEAST, ("kpk",))
+            "Islamabad" -> (None, ("islamabad",))
         """
-        if not location_string or not location_string.strip():
+        if not location_string:
             return None, ()
         
-        location_string = location_string.strip()
-        
-        # Check for directional indicators (single pass through pattern list)
-        detected_direction: Optional[Direction] = None
-        cleaned_string = location_string
-        
-        for direction, pattern in self._DIRECTION_PATTERNS:
-            match = pattern.search(cleaned_string)
-            if match:
-                detected_direction = direction
-                # Remove matched direction from string
-                cleaned_string = pattern.sub('', cleaned_string).strip()
-                break  # Stop after first match (compound directions matched first)
-        
-        if not detected_direction:
-            return None, (location_string,)
-        
-        # Return single place name (no conjunction splitting)
-        cleaned_place = cleaned_string.strip()
-        if not cleaned_place:
-            return detected_direction, ()
-        
-        return detected_direction, (cleaned_place,)
+        return _parse_normalized(' '.join(location_string.lower().split()))
     
     def clear_cache(self):
         """Clear the LRU cache (useful for testing or memory management)"""
-        self.parse.cache_clear()
\ No newline at end of file
+        _parse_normalized.cache_clear()
+
+
+@lru_cache(maxsize=1024)
+def _parse_normalized(location_string: str) -> Tuple[Optional[Direction], Tuple[str, ...]]:
+    """
+    Parse an already-normalized location string (see DirectionalParser.parse).
+    
+    Args:
+        location_string: Lowercased, whitespace-collapsed location text
+        
+    Returns:
+        (direction, (place_name,)) or (None, (location_string,)) if no direction found
+    """
+    if not location_string:
+        return None, ()
+    
+    if not DirectionalParser._DIRECTION_HINT.search(location_string):
+        return None, (location_string,)
+    
+    # Single scan for directional indicators, recording where each one
+    # matched. If several are present, the highest-priority one wins
+    # (compound directions before simple ones).
+    spans_by_priority: Dict[int, List[Tuple[int, int]]] = {}
+    for match in DirectionalParser._COMBINED_PATTERN.finditer(location_string):
+        priority = DirectionalParser._GROUP_PRIORITY[match.lastgroup]  # type: ignore[index]
+        spans_by_priority.setdefault(priority, []).append(match.span())
+    
+    if not spans_by_priority:
+        return None, (location_string,)
+    
+    # Remove every occurrence of the winning direction by slicing out the
+    # recorded spans (no second regex pass)
+    best_priority = min(spans_by_priority)
+    detected_direction = DirectionalParser._DIRECTION_PATTERNS[best_priority][0]
+    pieces = []
+    last_end = 0
+    for start, end in spans_by_priority[best_priority]:
+        pieces.append(location_string[last_end:start])
+        last_end = end
+    pieces.append(location_string[last_end:])
+    # Rejoin on single spaces; removing a span can leave a double space
+    cleaned_place = ' '.join(''.join(pieces).split())
+    
+    # Return single place name (no conjunction splitting)
+    if not cleaned_place:
+        return detected_direction, ()
+    
+    return detected_direction, (cleaned_place,)
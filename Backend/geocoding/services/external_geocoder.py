@@ -1,42 +1,106 @@
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Sequence, Optional
 import httpx
-import hashlib
-from datetime import datetime, timedelta
+import orjson
 import logging
+import math
 import asyncio
+from functools import partial
 
 from .redis_cache import get_redis_cache
+from .memory_cache import MemoryCache, MISSING
 
 logger = logging.getLogger(__name__)
 
+# A (longitude, latitude) pair. API results are tuples; Redis hits are the
+# decoded JSON lists, returned as-is. Callers only unpack or index them.
+Coordinate = Sequence[float]
+
 class ExternalGeocoder:
     """
     External geocoding service client with intelligent caching and disambiguation.
     
     Optimizations:
+    - In-process LRU cache (OrderedDict-backed) in front of Redis
     - Redis distributed cache with TTL to minimize API calls
-    - Connection pooling via shared httpx.AsyncClient
-    - Batch request support for parallel geocoding
+    - Connection pooling via shared httpx.AsyncClient (explicit limits, HTTP/2)
+    - Batch request support for parallel geocoding (bounded concurrency)
     - Spatial disambiguation using centroid calculation
     """
     
-    def __init__(self, api_key: str, base_url: str, cache_ttl_days: int = 30, max_cache_size: int = 1000):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        cache_ttl_days: int = 30,
+        max_cache_size: int = 1000,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 50,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        max_concurrent_requests: int = 20
+    ):
+        """
+        Initialize geocoder.
+        
+        Args:
+            api_key: Geocoding API key
+            base_url: Geocoding API base URL
+            cache_ttl_days: Cache lifetime for results
+            max_cache_size: Entries kept in the in-process cache
+            max_connections: Connection pool size of the shared HTTP client
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept open
+            http2: Multiplex requests to the (single) API host over HTTP/2
+            max_concurrent_requests: Upper bound on API requests in flight
+                (cache lookups are not limited)
+        """
         self.api_key = api_key
         self.base_url = base_url
         self.cache_ttl_seconds = int(cache_ttl_days * 86400)  # Convert to seconds for Redis
-        self.max_cache_size = max_cache_size  # Not used with Redis but kept for compatibility
+        self.max_cache_size = max_cache_size
+        # Hot lookups skip the Redis round-trip; true LRU (hits refresh recency)
+        self._memory_cache = MemoryCache(max_size=max_cache_size, ttl_seconds=self.cache_ttl_seconds)
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._http2 = http2
+        # Backpressure for large batches against a rate-limited upstream
+        self._request_semaphore = asyncio.Semaphore(max_concurrent_requests)
         self._client: Optional[httpx.AsyncClient] = None
+        # Query parameters shared by every request (default country included);
+        # each call only adds the location
+        self._base_params = {
+            'key': api_key,
+            'format': 'json',
+            'countrycodes': 'pk',
+            'limit': 5
+        }
         
+    async def connect(self):
+        """Initialize the shared, pooled HTTP client (idempotent)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                http2=self._http2,
+                limits=self._limits
+            )
+    
+    async def disconnect(self):
+        """Close the shared HTTP client"""
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+    
     async def __aenter__(self):
         """Async context manager entry - initialize persistent HTTP client"""
-        self._client = httpx.AsyncClient(timeout=10.0)
+        await self.connect()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit - cleanup HTTP client"""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        await self.disconnect()
     
     def _get_cache_key(self, location: str, country_filter: str = "pk") -> str:
         """Generate cache key from location string and country filter"""
@@ -47,7 +111,7 @@ class ExternalGeocoder:
         self, 
         location: str,
         country_filter: str = "pk"  # Pakistan only
-    ) -> List[Tuple[float, float]]:
+    ) -> List[Coordinate]:
         """
         Geocode a location string to coordinates.
         NOW WITH REDIS CACHING.
@@ -57,37 +121,57 @@ class ExternalGeocoder:
             country_filter: ISO country code filter (default: 'pk' for Pakistan)
             
         Returns:
-            List of (longitude, latitude) tuples, ordered by relevance
+            List of (longitude, latitude) pairs, ordered by relevance
         """
-        # Try Redis cache first
-        cache = get_redis_cache()
         cache_key = self._get_cache_key(location, country_filter)
         
+        # In-process cache first; concurrent misses for the same key share
+        # one Redis lookup / API request instead of each issuing their own
+        return await self._memory_cache.get_or_load(
+            cache_key,
+            lambda: self._geocode_uncached(location, country_filter, cache_key),
+            cache_if=bool
+        )
+    
+    async def _geocode_uncached(
+        self,
+        location: str,
+        country_filter: str,
+        cache_key: str
+    ) -> List[Coordinate]:
+        """Geocode via Redis, then the external API, bypassing the in-process cache"""
+        cache = get_redis_cache()
         if cache:
             cached_result = await cache.get("external_geocode", cache_key)
             if cached_result is not None:
                 logger.debug(f"✅ External geocode cache HIT for '{location}'")
-                # Convert list of lists back to list of tuples
-                return [tuple(coord) for coord in cached_result]
+                return cached_result
+        
+        return await self._request(location, country_filter, cache_key)
+    
+    async def _request(
+        self,
+        location: str,
+        country_filter: str,
+        cache_key: str
+    ) -> List[Coordinate]:
+        """Call the external API and write successful results to Redis"""
+        cache = get_redis_cache()
         
         # Make API request
         try:
             # Use persistent client if available (via context manager), else create temporary one
             client = self._client if self._client else httpx.AsyncClient(timeout=10.0)
             
+            params = {**self._base_params, 'q': location}
+            if country_filter != params['countrycodes']:
+                params['countrycodes'] = country_filter
+            
             try:
-                response = await client.get(
-                    f"{self.base_url}/search",
-                    params={
-                        'key': self.api_key,
-                        'q': location,
-                        'format': 'json',
-                        'countrycodes': country_filter,
-                        'limit': 5
-                    }
-                )
+                async with self._request_semaphore:
+                    response = await client.get(f"{self.base_url}/search", params=params)
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content)
                 
                 if not data:
                     logger.warning(f"No geocoding results for '{location}'")
@@ -96,11 +180,10 @@ class ExternalGeocoder:
                 # Extract coordinates (lon, lat)
                 coords = [(float(r['lon']), float(r['lat'])) for r in data if 'lon' in r and 'lat' in r]
                 
-                # Cache results in Redis
+                # Cache results in Redis (get_or_load fills the in-process cache)
                 if cache and coords:
-                    # Convert tuples to lists for JSON serialization
-                    coords_serializable = [list(coord) for coord in coords]
-                    await cache.set("external_geocode", cache_key, coords_serializable, ttl_seconds=self.cache_ttl_seconds)
+                    # orjson encodes the tuples as arrays directly
+                    await cache.set("external_geocode", cache_key, coords, ttl_seconds=self.cache_ttl_seconds)
                     logger.debug(f"💾 External geocode cache SET for '{location}'")
                 
                 return coords
@@ -124,7 +207,7 @@ class ExternalGeocoder:
         self,
         locations: List[str],
         country_filter: str = "pk"
-    ) -> Dict[str, List[Tuple[float, float]]]:
+    ) -> Dict[str, List[Coordinate]]:
         """
         Geocode multiple locations in parallel for efficiency.
         
@@ -135,24 +218,81 @@ class ExternalGeocoder:
         Returns:
             Dict mapping location strings to coordinate lists
         """
-        # Use context manager for efficient connection pooling
+        # Reuse the shared client if connected; otherwise open one for this batch
+        if self._client is not None:
+            return await self._gather_batch(locations, country_filter)
+        
         async with self:
-            tasks = [self.geocode(loc, country_filter) for loc in locations]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            return {
-                loc: res if isinstance(res, list) else []
-                for loc, res in zip(locations, results)
-            }
+            return await self._gather_batch(locations, country_filter)
+    
+    async def _gather_batch(
+        self,
+        locations: List[str],
+        country_filter: str
+    ) -> Dict[str, List[Coordinate]]:
+        """
+        Geocode all locations on the current client.
+        
+        Cache hits are resolved up front (in-process, then one Redis MGET),
+        so only true misses are dispatched as concurrent API requests.
+        """
+        cache_keys = {
+            loc: self._get_cache_key(loc, country_filter)
+            for loc in locations
+        }
+        coords_by_location: Dict[str, List[Coordinate]] = {}
+        
+        uncached = []
+        for loc, cache_key in cache_keys.items():
+            coords = self._memory_cache.get(cache_key)
+            if coords is MISSING:
+                uncached.append(loc)
+            else:
+                coords_by_location[loc] = coords
+        
+        cache = get_redis_cache()
+        if cache and uncached:
+            redis_hits = await cache.get_many(
+                "external_geocode",
+                list({cache_keys[loc] for loc in uncached})
+            )
+            misses = []
+            for loc in uncached:
+                cached_result = redis_hits.get(cache_keys[loc])
+                if cached_result is None:
+                    misses.append(loc)
+                    continue
+                self._memory_cache.set(cache_keys[loc], cached_result)
+                coords_by_location[loc] = cached_result
+            uncached = misses
+        
+        # Remaining misses go to the API; get_or_load still coalesces keys
+        # shared by several locations (e.g. differing only in case)
+        results = await asyncio.gather(
+            *(
+                self._memory_cache.get_or_load(
+                    cache_keys[loc],
+                    partial(self._request, loc, country_filter, cache_keys[loc]),
+                    cache_if=bool
+                )
+                for loc in uncached
+            ),
+            return_exceptions=True
+        )
+        for loc, res in zip(uncached, results):
+            coords_by_location[loc] = res if isinstance(res, list) else []
+        
+        return {loc: coords_by_location[loc] for loc in cache_keys}
     
     def disambiguate_by_centroid(
         self,
-        candidates: List[Tuple[float, float]],
-        context_coords: List[Tuple[float, float]]
-    ) -> Tuple[float, float]:
+        candidates: List[Coordinate],
+        context_coords: List[Coordinate]
+    ) -> Coordinate:
         """
         Select the coordinate closest to the centroid of context coordinates.
-        Implements spatial context disambiguation as per spec.
+        Implements spatial context disambiguation as per spec, using
+        great-circle (haversine) distance.
         
         Time Complexity: O(n + m) where n = candidates, m = context_coords
         
@@ -169,13 +309,32 @@ class ExternalGeocoder:
         if len(candidates) == 1 or not context_coords:
             return candidates[0]
         
-        # Calculate centroid in O(m) time
-        centroid_lon = sum(c[0] for c in context_coords) / len(context_coords)
-        centroid_lat = sum(c[1] for c in context_coords) / len(context_coords)
+        # Calculate centroid in O(m) time; unzipping once lets sum() run over
+        # plain float tuples in C instead of driving a generator per axis
+        context_lons, context_lats = zip(*context_coords)
+        centroid_lon = sum(context_lons) / len(context_lons)
+        centroid_lat = sum(context_lats) / len(context_lats)
+        
+        # Find closest candidate in O(n) time by great-circle distance.
+        # Planar distance on degrees overweights longitude at Pakistan's
+        # latitudes (a degree of longitude is ~0.87 of one of latitude at 30°N).
+        # Haversine is monotonic in its `a` term, so comparing `a` directly
+        # gives the same argmin without the arcsin/sqrt. One explicit pass with
+        # locals bound up front avoids a key-function call per candidate.
+        sin, cos, radians = math.sin, math.cos, math.radians
+        centroid_lat_rad = radians(centroid_lat)
+        cos_centroid_lat = cos(centroid_lat_rad)
         
-        # Find closest candidate in O(n) time using squared Euclidean distance
-        # (no need for sqrt since we're only comparing distances)
-        def squared_distance(coord: Tuple[float, float]) -> float:
-            return (coord[0] - centroid_lon)**2 + (coord[1] - centroid_lat)**2
+        best = candidates[0]
+        best_term = float('inf')
+        for candidate in candidates:
+            lon, lat = candidate
+            lat_rad = radians(lat)
+            term = (
+                sin((lat_rad - centroid_lat_rad) / 2) ** 2
+                + cos_centroid_lat * cos(lat_rad) * sin(radians(lon - centroid_lon) / 2) ** 2
+            )
+            if term < best_term:
+                best, best_term = candidate, term
         
-        return min(candidates, key=squared_distance)
\ No newline at end of file
+        return best
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional, Tuple, Set
+from typing import List, Dict, Any, Optional, Tuple, Set, AsyncIterator
 from uuid import UUID
 import logging
 import asyncio
@@ -9,10 +9,24 @@ from ..repositories.places_repository import PlacesRepository
 from .name_matcher import NameMatcher
 from .external_geocoder import ExternalGeocoder
 from .directional_parser import DirectionalParser, Direction
+from .memory_cache import MemoryCache, MISSING
 
 logger = logging.getLogger(__name__)
 
 
+def _as_uuid(value: Any) -> UUID:
+    """Coerce a place ID as returned by the database to UUID, converting directly by type"""
+    if type(value) is UUID:
+        return value
+    if isinstance(value, str):
+        return UUID(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return UUID(bytes=bytes(value))
+    if isinstance(value, int):
+        return UUID(int=value)
+    return UUID(str(value))
+
+
 class GeocodingService:
     """
     Main orchestration service for geocoding location strings.
@@ -32,12 +46,34 @@ class GeocodingService:
         places_repo: PlacesRepository,
         name_matcher: NameMatcher,
         external_geocoder: ExternalGeocoder,
-        directional_parser: DirectionalParser
+        directional_parser: DirectionalParser,
+        result_cache_size: int = 10_000,
+        result_cache_ttl_seconds: float = 86400 * 30,
+        batch_concurrency: int = 20
     ):
         self.repo = places_repo
         self.matcher = name_matcher
         self.geocoder = external_geocoder
         self.parser = directional_parser
+        self.batch_concurrency = batch_concurrency
+        
+        # In-process LRU of resolved results, keyed on normalized input + options
+        self._result_cache = MemoryCache(
+            max_size=result_cache_size,
+            ttl_seconds=result_cache_ttl_seconds
+        )
+    
+    def _result_cache_key(self, location: str, options: GeocodeOptions) -> Tuple[str, bool, bool]:
+        """Build result cache key from case-folded location and output-affecting options"""
+        return (
+            location.strip().casefold(),
+            options.prefer_lower_admin_levels,
+            options.include_confidence_scores
+        )
+    
+    def clear_result_cache(self):
+        """Clear the in-process result cache (useful for testing or after data reloads)"""
+        self._result_cache.clear()
     
     async def geocode_location(
         self,
@@ -48,6 +84,43 @@ class GeocodingService:
         """
         Geocode a single location string.
         
+        Successful results are memoized in an in-process LRU keyed on the
+        normalized location, so repeated place names skip the database.
+        Calls with batch_context bypass the cache since disambiguation
+        depends on the surrounding batch.
+        
+        Args:
+            location: Location string to geocode
+            options: Geocoding options
+            batch_context: Context coordinates from other locations in batch (for disambiguation)
+            
+        Returns:
+            GeocodeResult with matched places or error
+        """
+        cache_key = None
+        if batch_context is None:
+            cache_key = self._result_cache_key(location, options)
+            cached_result = self._result_cache.get(cache_key)
+            if cached_result is not MISSING:
+                return cached_result.model_copy(update={'input': location})
+        
+        result = await self._geocode_location_uncached(location, options, batch_context)
+        
+        # Only cache clean successes; errors may be transient (network, DB)
+        if cache_key is not None and result.matched_places and not result.error:
+            self._result_cache.set(cache_key, result)
+        
+        return result
+    
+    async def _geocode_location_uncached(
+        self,
+        location: str,
+        options: GeocodeOptions,
+        batch_context: Optional[List[Tuple[float, float]]] = None
+    ) -> GeocodeResult:
+        """
+        Geocode a single location string without consulting the result cache.
+        
         Args:
             location: Location string to geocode
             options: Geocoding options
@@ -93,9 +166,14 @@ class GeocodingService:
         Geocode multiple locations with context-aware disambiguation.
         
         Strategy:
-        1. First pass: Try fuzzy matching for all locations
-        2. Collect coordinates for successful matches
-        3. Second pass: Geocode failures with centroid context
+        1. First pass: Geocode all locations without context
+        2. Collect centroids of places matched by name
+        3. Second pass: Re-run locations that fell back to external geocoding
+           (where the first of several candidates was taken blindly) with
+           those centroids as context for disambiguation
+        
+        Locations are processed concurrently, bounded by batch_concurrency
+        so a large batch cannot exhaust the database/HTTP connection pools.
         
         Time Complexity: O(n * log m) where n = locations, m = places in DB
         
@@ -104,20 +182,112 @@ class GeocodingService:
             options: Geocoding options
             
         Returns:
-            List of GeocodeResult objects
+            List of GeocodeResult objects (same order as locations)
         """
         if not locations:
             return []
         
-        results = []
-        
-        # Process each location
-        for location in locations:
-            result = await self.geocode_location(location, options, None)
-            results.append(result)
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+        
+        results = list(await asyncio.gather(
+            *(self._geocode_bounded(loc, options, semaphore) for loc in locations)
+        ))
+        
+        retry_indexes = [
+            i for i, result in enumerate(results)
+            if self._needs_batch_context(result)
+        ]
+        if not retry_indexes:
+            return results
+        
+        # Context comes from places matched by name (not from other external
+        # lookups, which are themselves uncertain)
+        context_ids = [
+            place.id
+            for result in results
+            for place in result.matched_places
+            if place.match_method in ('exact_name', 'fuzzy_name')
+        ]
+        if not context_ids:
+            return results
+        
+        centroids = await self.repo.get_centroids(context_ids)
+        batch_context = list(centroids.values())
+        if not batch_context:
+            return results
+        
+        logger.debug(f"Re-geocoding {len(retry_indexes)} location(s) with {len(batch_context)} context point(s)")
+        
+        # External/point lookups are cached, so the second pass mostly
+        # repeats in-memory work and only changes which candidate is chosen
+        retried = await asyncio.gather(
+            *(
+                self._geocode_bounded(locations[i], options, semaphore, batch_context)
+                for i in retry_indexes
+            )
+        )
+        for i, result in zip(retry_indexes, retried):
+            if result.matched_places or not results[i].matched_places:
+                results[i] = result
         
         return results
     
+    @staticmethod
+    def _needs_batch_context(result: GeocodeResult) -> bool:
+        """Whether a first-pass result came from (or failed in) the external-geocoding fallback"""
+        if result.direction is not None:
+            return False
+        if result.matched_places:
+            return result.matched_places[0].match_method == 'point_in_polygon'
+        return bool(result.error) and 'not within' in result.error
+    
+    async def geocode_stream(
+        self,
+        locations: List[str],
+        options: GeocodeOptions
+    ) -> AsyncIterator[GeocodeResult]:
+        """
+        Geocode multiple locations, yielding each result as soon as it is ready.
+        
+        Same bounded concurrency as geocode_batch, but results are yielded in
+        completion order (not input order) so callers can start consuming
+        before the whole batch finishes. Each result carries its input string.
+        
+        Args:
+            locations: List of location strings
+            options: Geocoding options
+            
+        Yields:
+            GeocodeResult objects in completion order
+        """
+        if not locations:
+            return
+        
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+        tasks = [
+            asyncio.ensure_future(self._geocode_bounded(loc, options, semaphore))
+            for loc in locations
+        ]
+        
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Consumer stopped early (e.g. client disconnected) - drop pending work
+            for task in tasks:
+                task.cancel()
+    
+    async def _geocode_bounded(
+        self,
+        location: str,
+        options: GeocodeOptions,
+        semaphore: asyncio.Semaphore,
+        batch_context: Optional[List[Tuple[float, float]]] = None
+    ) -> GeocodeResult:
+        """Geocode a single location while holding a slot of the batch semaphore"""
+        async with semaphore:
+            return await self.geocode_location(location, options, batch_context)
+    
     async def _process_simple(
         self,
         original_input: str,
@@ -262,19 +432,18 @@ class GeocodingService:
         
         logger.info(f"Matching base places: {place_names}")
         
+        # One batched search for every base name instead of one round-trip each
+        matches = await self.matcher.match_multiple(list(place_names))
+        
         for place_name in place_names:
-            match = await self.matcher.match(place_name)
+            match = matches.get(place_name)
             if match:
-                # FIX: Handle both string and UUID types
-                place_id = match['id']
-                if isinstance(place_id, str):
-                    place_id = UUID(place_id)
-                elif not isinstance(place_id, UUID):
-                    place_id = UUID(str(place_id))
+                place_id = _as_uuid(match['id'])
                 
                 base_place_ids.append(place_id)
                 matched_base_names.append(match['name'])
-                logger.debug(f"  Matched '{place_name}' -> {match['name']} ({place_id})")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"  Matched '{place_name}' -> {match['name']} ({place_id})")
             else:
                 logger.warning(f"  Could not match base place: '{place_name}'")
                 failed_matches.append(place_name)
@@ -293,14 +462,13 @@ class GeocodingService:
         
         # Step 1.5: Check cache for FINAL AGGREGATED result
         # This caches the complete result including aggregation (much faster!)
-        from .redis_cache import get_redis_cache
+        from .redis_cache import get_redis_cache, directional_key
         from ..config import get_settings
         
         cache = get_redis_cache()
         if cache:
-            # Create cache key from sorted base place IDs + direction
-            sorted_ids = sorted(str(pid) for pid in base_place_ids)
-            cache_key = f"aggregated:{','.join(sorted_ids)}:{direction.value}"
+            # Order-insensitive, fixed-length key over base place IDs + direction
+            cache_key = directional_key(base_place_ids, direction.value)
             
             cached_result = await cache.get("directional_aggregated", cache_key)
             if cached_result is not None:
@@ -321,7 +489,7 @@ class GeocodingService:
         logger.info(f"Querying directional region: {direction.value} of {matched_base_names}")
         directional_places = await self.repo.find_places_in_direction(
             base_place_ids,
-            direction.value
+            direction
         )
         
         logger.info(f"Found {len(directional_places)} places in directional region")
@@ -369,15 +537,8 @@ class GeocodingService:
         matched_places = []
         for place in aggregated_places:
             try:
-                # FIX: Handle UUID conversion safely
-                place_id = place['id']
-                if isinstance(place_id, str):
-                    place_id = UUID(place_id)
-                elif not isinstance(place_id, UUID):
-                    place_id = UUID(str(place_id))
-                
                 matched_place = MatchedPlace(
-                    id=place_id,
+                    id=_as_uuid(place['id']),
                     name=place['name'],
                     hierarchy_level=place['hierarchy_level'],
                     match_method='directional_intersection',
@@ -403,8 +564,6 @@ class GeocodingService:
             ]
             
             settings = get_settings()
-            sorted_ids = sorted(str(pid) for pid in base_place_ids)
-            cache_key = f"aggregated:{','.join(sorted_ids)}:{direction.value}"
             
             await cache.set(
                 "directional_aggregated", 
@@ -437,10 +596,13 @@ class GeocodingService:
         Example: If all 5 tehsils of a district are matched, return only the district.
                  If only 3 of 5 tehsils are matched, return those 3 tehsils (not the district).
         
-        Time Complexity: O(n + k*d) where:
+        Every ancestor of the matched places is fetched up front, with its
+        child count, in one round-trip; the level-by-level passes (tehsils
+        into districts, districts into provinces) then run in memory.
+        
+        Time Complexity: O(n * h) where:
             n = number of places
-            k = number of unique parents to check
-            d = database query time (typically O(1) with index)
+            h = number of hierarchy levels aggregated (one pass each)
         
         Args:
             places: List of matched places with hierarchy info
@@ -451,7 +613,6 @@ class GeocodingService:
         if not places:
             return []
         
-        # Validate places have required fields
         valid_places = []
         for place in places:
             if not isinstance(place, dict):
@@ -466,103 +627,131 @@ class GeocodingService:
             logger.error("No valid places to aggregate")
             return []
         
-        # Build lookup structures
-        place_by_id: Dict[str, Dict[str, Any]] = {}
-        for p in valid_places:
-            place_id = str(p['id'])
-            place_by_id[place_id] = p
+        # Parents (and their parents, up to the root) with actual child counts
+        parent_ids = list({str(p['parent_id']) for p in valid_places if p.get('parent_id')})
+        if not parent_ids:
+            # Only root-level places: nothing can aggregate or be redundant
+            return valid_places
+        ancestors, actual_child_counts = \
+            await self.repo.get_ancestors_and_children_counts(parent_ids)
+        
+        aggregated = valid_places
+        while True:
+            aggregated, needs_another_pass = self._aggregate_level(
+                aggregated, ancestors, actual_child_counts
+            )
+            if not needs_another_pass:
+                break
+            logger.debug("Recursive aggregation needed - parents have parents in result set")
+        
+        return aggregated
+    
+    def _aggregate_level(
+        self,
+        places: List[Dict[str, Any]],
+        parent_details: Dict[str, Dict[str, Any]],
+        actual_child_counts: Dict[str, int]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        One aggregation pass over places (see _aggregate_hierarchy).
         
-        # Group places by parent_id
-        by_parent: Dict[Optional[str], List[Dict[str, Any]]] = defaultdict(list)
+        Args:
+            places: Validated places
+            parent_details: Parent places by ID
+            actual_child_counts: Direct-children counts by parent ID
+            
+        Returns:
+            (aggregated places, whether another pass is needed)
+        """
+        # Single pass: index by ID and group children by parent. String IDs
+        # are computed once here and kept in step with valid_places
+        valid_places = list(places)
+        valid_ids: List[str] = []
+        place_by_id: Dict[str, Dict[str, Any]] = {}
+        by_parent: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         for place in valid_places:
+            place_id = str(place['id'])
+            valid_ids.append(place_id)
+            place_by_id[place_id] = place
             parent_id = place.get('parent_id')
-            parent_key = str(parent_id) if parent_id else None
-            by_parent[parent_key].append(place)
+            if parent_id:
+                by_parent[str(parent_id)].append(place)
         
         # Track which places to remove (either children or parents)
         places_to_remove: Set[str] = set()
         
+        # Checked once: the per-parent messages below are only built when
+        # they will actually be emitted
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        info_enabled = logger.isEnabledFor(logging.INFO)
+        
         # STEP 1: Remove redundant parents (when ANY of their children are present)
-        for place in valid_places:
-            parent_id = place.get('parent_id')
-            if parent_id and str(parent_id) in place_by_id:
-                # This place has a parent in the results - mark parent for removal
-                places_to_remove.add(str(parent_id))
-                logger.debug(f"Removing parent {parent_id} because child {place['id']} is present")
+        for parent_id, children in by_parent.items():
+            if parent_id in place_by_id:
+                # This parent has a child in the results - mark it for removal
+                places_to_remove.add(parent_id)
+                if debug_enabled:
+                    logger.debug(f"Removing parent {parent_id} because child {children[0]['id']} is present")
         
         # STEP 2: Check if we should aggregate children UP to parent
-        # Get unique parent IDs from all matched places (parents don't need to be in results already)
-        unique_parent_ids = set()
-        for place in valid_places:
-            parent_id = place.get('parent_id')
-            if parent_id:
-                unique_parent_ids.add(str(parent_id))
-        
-        # Get actual child counts from database for all parent IDs
-        if unique_parent_ids:
-            parent_uuids = [UUID(pid) for pid in unique_parent_ids]
+        # Every parent of a matched place is a candidate (parents don't need to be in results already)
+        logger.debug(f"Checking aggregation for {len(by_parent)} parents")
+        
+        # Deepest parents first, so a higher-level parent that also
+        # aggregates gets the final say over its (aggregated) children
+        # regardless of input order
+        deepest_first = sorted(
+            by_parent.items(),
+            key=lambda item: item[1][0]['hierarchy_level'],
+            reverse=True
+        )
+        for parent_id, children_in_results in deepest_first:
+            # How many children does this parent have in our results?
+            matched_count = len(children_in_results)
             
-            # OPTIMIZATION: Batch fetch both child counts AND parent details in parallel
-            actual_child_counts, parent_details = await asyncio.gather(
-                self.repo.get_children_counts_batch(parent_uuids),
-                self.repo.get_by_ids_batch(parent_uuids)
-            )
+            # How many children does this parent have in total?
+            total_count = actual_child_counts.get(parent_id, 0)
             
-            logger.debug(f"Checking aggregation for {len(unique_parent_ids)} parents")
+            if debug_enabled:
+                logger.debug(f"Parent {parent_id}: {matched_count}/{total_count} children matched")
             
-            for parent_id in unique_parent_ids:
-                # How many children does this parent have in our results?
-                children_in_results = by_parent.get(parent_id, [])
-                matched_count = len(children_in_results)
+            # If ALL children are present, aggregate to parent
+            if total_count > 0 and matched_count >= total_count:
+                if info_enabled:
+                    logger.info(f"Aggregating UP: Parent {parent_id} has all {total_count} children - replacing with parent")
                 
-                # How many children does this parent have in total?
-                total_count = actual_child_counts.get(parent_id, 0)
+                # Add parent to results if not already there
+                if parent_id not in place_by_id and parent_id in parent_details:
+                    place_by_id[parent_id] = parent_details[parent_id]
+                    valid_places.append(parent_details[parent_id])
+                    valid_ids.append(parent_id)
                 
-                logger.debug(f"Parent {parent_id}: {matched_count}/{total_count} children matched")
+                # Remove the parent from removal set (we want to keep it)
+                places_to_remove.discard(parent_id)
                 
-                # If ALL children are present, aggregate to parent
-                if total_count > 0 and matched_count >= total_count:
-                    logger.info(f"Aggregating UP: Parent {parent_id} has all {total_count} children - replacing with parent")
-                    
-                    # Add parent to results if not already there
-                    if parent_id not in place_by_id and parent_id in parent_details:
-                        place_by_id[parent_id] = parent_details[parent_id]
-                        valid_places.append(parent_details[parent_id])
-                    
-                    # Remove the parent from removal set (we want to keep it)
-                    places_to_remove.discard(parent_id)
-                    
-                    # Mark all children for removal
-                    for child in children_in_results:
-                        places_to_remove.add(str(child['id']))
-        
-        # Build final result excluding marked places
+                # Mark all children for removal
+                for child in children_in_results:
+                    places_to_remove.add(str(child['id']))
+        
+        # Build final result excluding marked places, collecting the kept
+        # IDs as we go for the next-pass check below
         aggregated = []
-        for place in valid_places:
-            place_id = str(place['id'])
+        aggregated_ids: Set[str] = set()
+        for place_id, place in zip(valid_ids, valid_places):
             if place_id not in places_to_remove:
                 aggregated.append(place)
+                aggregated_ids.add(place_id)
         
         logger.info(f"Aggregation: {len(valid_places)} -> {len(aggregated)} places "
                     f"(removed {len(places_to_remove)} redundant places)")
         
-        # OPTIMIZATION: Check if we need recursive aggregation
-        # Only recurse if we added new parents that might themselves need aggregation
-        # This happens when districts aggregate to provinces, which might aggregate to country
-        if places_to_remove and len(aggregated) > 1:
-            # Check if any newly added parents have parent_ids in the result set
-            needs_recursion = False
-            for place in aggregated:
-                parent_id = place.get('parent_id')
-                if parent_id and str(parent_id) in {str(p['id']) for p in aggregated}:
-                    needs_recursion = True
-                    break
-            
-            if needs_recursion:
-                logger.debug("Recursive aggregation needed - parents have parents in result set")
-                return await self._aggregate_hierarchy(aggregated)
-        
-        return aggregated
+        # Another pass only if we added new parents that might themselves
+        # need aggregation (districts into provinces, provinces into country)
+        needs_another_pass = bool(places_to_remove) and len(aggregated) > 1 and any(
+            place.get('parent_id') and str(place['parent_id']) in aggregated_ids
+            for place in aggregated
+        )
+        return aggregated, needs_another_pass
     
     async def suggest_alternatives(
         self,
@@ -615,20 +804,12 @@ class GeocodingService:
             ids = await service.geocode_batch_simple(names)
             # Returns: ["uuid-islamabad", "uuid-lahore", "uuid-karachi"]
         """
-        options = GeocodeOptions()
-        results = []
-        
-        for name in place_names:
-            try:
-                result = await self.geocode_location(name, options)
-                if result.matched_places:
-                    # Return the first matched place ID
-                    results.append(str(result.matched_places[0].id))
-                else:
-                    # No match found
-                    results.append("")
-            except Exception as e:
-                logger.error(f"Error geocoding '{name}': {e}")
-                results.append("")
-        
-        return results
\ No newline at end of file
+        # Concurrent and bounded like geocode_batch; geocode_location turns
+        # failures into results with an error, so none of these raise
+        results = await self.geocode_batch(place_names, GeocodeOptions())
+        
+        # First matched place ID per input, or "" when nothing matched
+        return [
+            str(result.matched_places[0].id) if result.matched_places else ""
+            for result in results
+        ]
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+In-process caching layer for geocoding service.
+
+Sits in front of Redis/Supabase for read-mostly lookups:
+- Place lookups by ID
+- Fuzzy name search results
+- Point-in-polygon results
+- Resolved geocode results
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Sentinel returned by MemoryCache.get() when a key is absent or expired
+MISSING = object()
+
+
+class MemoryCache:
+    """
+    Bounded in-memory TTL + LRU cache with dog-pile protection.
+
+    Features:
+    - O(1) get/set with LRU eviction (OrderedDict)
+    - Per-entry expiry on the monotonic clock
+    - get_or_load() coalesces concurrent misses for the same key into one load
+
+    Not thread-safe; intended for use from a single event loop.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 600):
+        """
+        Initialize memory cache.
+
+        Args:
+            max_size: Maximum number of entries before LRU eviction
+            ttl_seconds: Default time-to-live for entries
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get cached value, refreshing its LRU position.
+
+        Returns:
+            Cached value, or MISSING if absent/expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """
+        Store value, evicting least-recently-used entries beyond capacity.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl_seconds: Time-to-live in seconds (uses default if None)
+        """
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        """Remove key if present"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries"""
+        self._entries.clear()
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        cache_if: Callable[[Any], bool] = lambda value: value is not None,
+        negative_ttl_seconds: Optional[float] = None
+    ) -> Any:
+        """
+        Return cached value or load it, sharing one in-flight load per key.
+
+        Concurrent callers that miss on the same key await the first caller's
+        load instead of issuing their own (prevents cache stampedes).
+
+        Args:
+            key: Cache key
+            loader: Zero-arg coroutine function producing the value
+            cache_if: Predicate deciding whether a loaded value is cached
+            negative_ttl_seconds: If set, values rejected by cache_if (misses)
+                are still cached, for this shorter time-to-live
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            # Shield so one waiter being cancelled doesn't cancel the shared load
+            return await asyncio.shield(in_flight)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; the error is re-raised to this caller
+            raise
+        else:
+            if cache_if(value):
+                self.set(key, value)
+            elif negative_ttl_seconds is not None:
+                self.set(key, value, ttl_seconds=negative_ttl_seconds)
+            future.set_result(value)
+            return value
+        finally:
+            del self._in_flight[key]
@@ -2,6 +2,8 @@ from typing import List, Optional, Dict, Any
 from uuid import UUID
 import logging
 
+from .memory_cache import MemoryCache, MISSING
+
 logger = logging.getLogger(__name__)
 
 class NameMatcher:
@@ -12,6 +14,7 @@ class NameMatcher:
     - Delegates fuzzy matching to PostgreSQL (pg_trgm) for efficiency
     - Implements business logic for candidate selection
     - Prefers more specific (higher hierarchy level) places when scores are similar
+    - Memoizes matches per normalized name; concurrent duplicates share one lookup
     
     Time Complexity: O(n log n) where n is number of candidates (for sorting)
     """
@@ -21,7 +24,9 @@ class NameMatcher:
         places_repo,
         threshold: float = 0.85,
         prefer_lower_levels: bool = True,
-        similarity_tolerance: float = 0.05
+        similarity_tolerance: float = 0.05,
+        cache_size: int = 2048,
+        cache_ttl_seconds: float = 600
     ):
         """
         Initialize name matcher.
@@ -31,11 +36,14 @@ class NameMatcher:
             threshold: Minimum similarity score for fuzzy matching (0-1)
             prefer_lower_levels: Prefer more specific places (higher hierarchy numbers)
             similarity_tolerance: Score difference within which to prefer lower levels
+            cache_size: Maximum number of memoized matches
+            cache_ttl_seconds: Time-to-live for memoized matches
         """
         self.repo = places_repo
         self.threshold = threshold
         self.prefer_lower_levels = prefer_lower_levels
         self.similarity_tolerance = similarity_tolerance
+        self._match_cache = MemoryCache(max_size=cache_size, ttl_seconds=cache_ttl_seconds)
     
     async def match(self, location: str) -> Optional[Dict[str, Any]]:
         """
@@ -58,17 +66,42 @@ class NameMatcher:
         
         location = location.strip()
         
+        # Repeated names across a batch ("Sindh" in many inputs) resolve once
+        return await self._match_cache.get_or_load(
+            self._cache_key(location),
+            lambda: self._match_uncached(location)
+        )
+    
+    @staticmethod
+    def _cache_key(location: str) -> str:
+        """Match-cache key: case-folded, whitespace collapsed"""
+        return ' '.join(location.casefold().split())
+    
+    def clear_cache(self):
+        """Clear memoized matches (useful for testing or after data reloads)"""
+        self._match_cache.clear()
+    
+    async def _match_uncached(self, location: str) -> Optional[Dict[str, Any]]:
+        """Fuzzy search and candidate selection for a stripped location, bypassing the match cache"""
         # Try fuzzy search via database (pg_trgm handles the heavy lifting)
         candidates = await self.repo.search_by_fuzzy_name(
             location, 
             self.threshold
         )
-        
+        return self._build_match(location, candidates)
+    
+    def _build_match(
+        self,
+        location: str,
+        candidates: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Pick the best of a name's fuzzy-search candidates and shape the match result"""
         if not candidates:
             logger.info(f"No fuzzy matches for '{location}' above threshold {self.threshold}")
             return None
         
-        logger.debug(f"Found {len(candidates)} candidates for '{location}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Found {len(candidates)} candidates for '{location}'")
         
         # Select best candidate using business rules
         best_match = self._select_best_candidate(candidates)
@@ -92,8 +125,9 @@ class NameMatcher:
         """
         Match multiple locations efficiently.
         
-        Note: Currently processes sequentially, but database connection pooling
-        helps. Could be parallelized further if needed.
+        Memoized names are answered from the match cache; all others are
+        searched with a single batched repository call (one round-trip
+        regardless of how many names miss).
         
         Args:
             locations: List of location names to match
@@ -101,9 +135,36 @@ class NameMatcher:
         Returns:
             Dict mapping location strings to match results
         """
-        results = {}
-        for location in locations:
-            results[location] = await self.match(location)
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        pending: Dict[str, List[str]] = {}  # normalized name -> inputs
+        stripped: Dict[str, str] = {}  # normalized name -> name to search
+        for location in dict.fromkeys(locations):
+            if not location or not location.strip():
+                logger.warning("Empty location string provided")
+                results[location] = None
+                continue
+            
+            key = self._cache_key(location)
+            cached = self._match_cache.get(key)
+            if cached is not MISSING:
+                results[location] = cached
+            else:
+                pending.setdefault(key, []).append(location)
+                stripped.setdefault(key, location.strip())
+        
+        if pending:
+            candidates_by_name = await self.repo.search_by_fuzzy_names_batch(
+                list(stripped.values()),
+                self.threshold
+            )
+            for key, inputs in pending.items():
+                name = stripped[key]
+                match = self._build_match(name, candidates_by_name.get(name, []))
+                if match is not None:
+                    self._match_cache.set(key, match)
+                for location in inputs:
+                    results[location] = match
+        
         return results
     
     def _select_best_candidate(
@@ -120,7 +181,7 @@ class NameMatcher:
         2. Otherwise:
            - Simply select highest similarity score
         
-        Time Complexity: O(n) with single-pass max comparison
+        Time Complexity: O(n) with two linear passes
         
         Args:
             candidates: List of candidate places with similarity scores
@@ -139,14 +200,19 @@ class NameMatcher:
         # Find the best similarity score
         best_similarity = max(c.get('similarity_score', 0) for c in candidates)
         
-        # Filter candidates within tolerance of best similarity
-        top_candidates = [
-            c for c in candidates
-            if best_similarity - c.get('similarity_score', 0) <= self.similarity_tolerance
-        ]
-        
-        # Among top candidates, prefer higher hierarchy level (more specific)
-        return max(top_candidates, key=lambda x: x.get('hierarchy_level', 0))
+        # Among candidates within tolerance of it, prefer higher hierarchy
+        # level (more specific); first one wins ties. Filtered inline, so no
+        # intermediate list. (The window depends on the global best score,
+        # so it can't be folded into the first pass.)
+        best = None
+        best_level = 0
+        for c in candidates:
+            if best_similarity - c.get('similarity_score', 0) > self.similarity_tolerance:
+                continue
+            level = c.get('hierarchy_level', 0)
+            if best is None or level > best_level:
+                best, best_level = c, level
+        return best
     
     def get_closest_suggestions(
         self,
@@ -8,11 +8,12 @@ Provides fast, distributed caching for:
 - Hierarchical aggregation results
 """
 
-from typing import Optional, Any, List, Dict
+from typing import Optional, Any, Iterable, List, Dict
 import redis.asyncio as redis
-import json
+import orjson
 import hashlib
 import logging
+import random
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
@@ -23,11 +24,12 @@ class RedisCache:
     Async Redis cache with automatic serialization/deserialization.
     
     Features:
-    - Automatic JSON serialization
+    - Automatic JSON serialization (orjson)
     - TTL support for cache expiration
     - Batch operations for efficiency
     - Connection pooling
     - Graceful degradation (logs errors but doesn't crash)
+    - TTL jitter so keys written in one burst don't all expire together
     """
     
     def __init__(
@@ -37,6 +39,7 @@ class RedisCache:
         db: int = 0,
         password: Optional[str] = None,
         default_ttl_seconds: int = 3600,  # 1 hour default
+        ttl_jitter: float = 0.1,
     ):
         """
         Initialize Redis cache client.
@@ -47,12 +50,15 @@ class RedisCache:
             db: Redis database number (0-15)
             password: Redis password (if auth enabled)
             default_ttl_seconds: Default TTL for cached items
+            ttl_jitter: Each TTL is scaled by a random factor in
+                [1 - ttl_jitter, 1 + ttl_jitter] (0 disables jitter)
         """
         self.host = host
         self.port = port
         self.db = db
         self.password = password
         self.default_ttl_seconds = default_ttl_seconds
+        self.ttl_jitter = ttl_jitter
         self._client: Optional[redis.Redis] = None
         
     async def connect(self):
@@ -127,7 +133,7 @@ class RedisCache:
             
             if value:
                 logger.debug(f"✅ Cache HIT: {namespace}:{identifier[:50]}")
-                return json.loads(value)
+                return orjson.loads(value)
             
             logger.debug(f"❌ Cache MISS: {namespace}:{identifier[:50]}")
             return None
@@ -135,6 +141,13 @@ class RedisCache:
             logger.warning(f"Redis GET error: {e}")
             return None
     
+    def _jittered_ttl(self, ttl_seconds: Optional[int]) -> int:
+        """Resolve the TTL for one key, spread by ±ttl_jitter to avoid synchronized expiry"""
+        ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
+        if not self.ttl_jitter:
+            return ttl
+        return max(1, int(ttl * random.uniform(1 - self.ttl_jitter, 1 + self.ttl_jitter)))
+    
     async def set(
         self,
         namespace: str,
@@ -149,7 +162,7 @@ class RedisCache:
             namespace: Cache namespace
             identifier: Cache key identifier
             value: Value to cache (will be JSON serialized)
-            ttl_seconds: Time-to-live in seconds (uses default if None)
+            ttl_seconds: Time-to-live in seconds (uses default if None; jittered)
             
         Returns:
             True if successful, False otherwise
@@ -159,10 +172,10 @@ class RedisCache:
         
         try:
             key = self._make_key(namespace, identifier)
-            ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
+            ttl = self._jittered_ttl(ttl_seconds)
             
-            # Serialize to JSON
-            serialized = json.dumps(value)
+            # Serialize to JSON (bytes; tuples encode as arrays)
+            serialized = orjson.dumps(value)
             
             # Set with TTL
             await self._client.setex(key, ttl, serialized)
@@ -220,7 +233,7 @@ class RedisCache:
             result = {}
             for ident, value in zip(identifiers, values):
                 if value:
-                    result[ident] = json.loads(value)
+                    result[ident] = orjson.loads(value)
             
             logger.debug(f"📦 Cache MGET: {namespace} ({len(result)}/{len(identifiers)} hits)")
             return result
@@ -240,7 +253,7 @@ class RedisCache:
         Args:
             namespace: Cache namespace
             items: Dict mapping identifier -> value
-            ttl_seconds: Time-to-live in seconds
+            ttl_seconds: Time-to-live in seconds (jittered per item)
             
         Returns:
             True if successful, False otherwise
@@ -249,18 +262,17 @@ class RedisCache:
             return False
         
         try:
-            ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
-            
-            # Use pipeline for atomic batch operation
-            async with self._client.pipeline() as pipe:
+            # Non-transactional pipeline: one round-trip, no MULTI/EXEC overhead
+            # (independent cache entries don't need atomicity)
+            async with self._client.pipeline(transaction=False) as pipe:
                 for identifier, value in items.items():
                     key = self._make_key(namespace, identifier)
-                    serialized = json.dumps(value)
-                    pipe.setex(key, ttl, serialized)
+                    serialized = orjson.dumps(value)
+                    pipe.setex(key, self._jittered_ttl(ttl_seconds), serialized)
                 
                 await pipe.execute()
             
-            logger.debug(f"💾 Cache MSET: {namespace} ({len(items)} items, TTL={ttl}s)")
+            logger.debug(f"💾 Cache MSET: {namespace} ({len(items)} items, TTL~{ttl_seconds or self.default_ttl_seconds}s)")
             return True
         except Exception as e:
             logger.warning(f"Redis MSET error: {e}")
@@ -310,6 +322,24 @@ class RedisCache:
             return False
 
 
+def hashed_key(*parts: str) -> str:
+    """
+    Build a fixed-length (32 hex chars) cache identifier from ordered parts.
+    
+    Keeps Redis keys short however long the inputs (names, ID lists) are.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode())
+        h.update(b'\x1f')  # Unit separator so ("ab", "c") != ("a", "bc")
+    return h.hexdigest()
+
+
+def directional_key(place_ids: Iterable[Any], direction: str) -> str:
+    """Cache identifier for a direction over a set of base places (order-insensitive)"""
+    return hashed_key(direction.lower(), *sorted(map(str, place_ids)))
+
+
 # Global cache instance (initialized in dependencies)
 _cache_instance: Optional[RedisCache] = None
 
@@ -84,7 +84,7 @@ async def test_cache_performance():
     print("=" * 60)
     
     try:
-        from geocoding.dependencies import get_places_repository
+        from geocoding.dependencies import get_places_repository, get_supabase_client
         from uuid import UUID
         
         cache = await get_redis_cache()
@@ -92,6 +92,7 @@ async def test_cache_performance():
             print("❌ Redis not available - skipping performance test")
             return
         
+        await get_supabase_client()
         repo = get_places_repository()
         
         # Test data - use a common directional query
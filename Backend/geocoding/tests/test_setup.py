@@ -41,6 +41,20 @@ def print_info(message: str):
     """Print info message"""
     print(f"  ℹ {message}")
 
+def run_with_repo(fn):
+    """Run fn(repo) on a fresh event loop with an async Supabase client bound to it"""
+    async def runner():
+        from supabase import acreate_client
+        from geocoding.config import get_settings
+        from geocoding.repositories.places_repository import PlacesRepository
+        settings = get_settings()
+        client = await acreate_client(settings.supabase_url, settings.supabase_key)
+        try:
+            return await fn(PlacesRepository(client))
+        finally:
+            await client.postgrest.aclose()
+    return asyncio.run(runner())
+
 
 # ============================================================================
 # PHASE 1: Configuration and Basic Connectivity
@@ -174,8 +188,10 @@ def test_phase_2():
         print_success("Basic index access working")
         print_info("Verify indexes manually in Supabase:")
         print_info("  - idx_places_name_trgm (GIN index)")
+        print_info("  - idx_places_name_lower")
         print_info("  - idx_places_polygon (GIST index)")
         print_info("  - idx_places_hierarchy")
+        print_info("  - idx_places_parent_level")
     except Exception as e:
         print_error(f"Index check failed: {e}")
     
@@ -200,6 +216,19 @@ def test_phase_2():
         print_info("Create this function in Supabase SQL Editor (see setup guide)")
         return False
     
+    # Test 4b: Test search_places_exact_or_fuzzy function (used by the repository)
+    print_test("Test search_places_exact_or_fuzzy function")
+    try:
+        result = client.rpc(
+            'search_places_exact_or_fuzzy',
+            {'search_name': 'Islamabad', 'similarity_threshold': 0.8}
+        ).execute()
+        print_success(f"Exact-or-fuzzy search working ({len(result.data or [])} results)")
+    except Exception as e:
+        print_error(f"search_places_exact_or_fuzzy function not found: {e}")
+        print_info("Run the SQL from db_queries.sql in Supabase SQL Editor")
+        return False
+    
     # Test 5: Test find_place_by_point function
     print_test("Test find_place_by_point function")
     try:
@@ -221,13 +250,55 @@ def test_phase_2():
         print_error(f"find_place_by_point function not found: {e}")
         print_info("Create this function in Supabase SQL Editor (see setup guide)")
         return False
-    
+
+    # Test 5b: Test children_counts function (used by get_children_counts_batch)
+    print_test("Test children_counts function")
+    try:
+        result = client.rpc('children_counts', {'parent_ids': []}).execute()
+        print_success("children_counts function available")
+    except Exception as e:
+        print_error(f"children_counts function not found: {e}")
+        print_info("Run the SQL from db_queries.sql in Supabase SQL Editor")
+        return False
+
+    # Test 5b2: Test ancestors_with_children_counts function (used by hierarchical aggregation)
+    print_test("Test ancestors_with_children_counts function")
+    try:
+        result = client.rpc('ancestors_with_children_counts', {'place_ids': []}).execute()
+        print_success("ancestors_with_children_counts function available")
+    except Exception as e:
+        print_error(f"ancestors_with_children_counts function not found: {e}")
+        print_info("Run the SQL from db_queries.sql in Supabase SQL Editor")
+        return False
+
+    # Test 5c: Test place_centroids function (used by batch disambiguation)
+    print_test("Test place_centroids function")
+    try:
+        result = client.rpc('place_centroids', {'place_ids': []}).execute()
+        print_success("place_centroids function available")
+    except Exception as e:
+        print_error(f"place_centroids function not found: {e}")
+        print_info("Run the SQL from db_queries.sql in Supabase SQL Editor")
+        return False
+
+    # Test 5d: Test search_places_exact_or_fuzzy_batch function (directional base names)
+    print_test("Test search_places_exact_or_fuzzy_batch function")
+    try:
+        result = client.rpc(
+            'search_places_exact_or_fuzzy_batch',
+            {'search_names': ['Lahore', 'Karachi'], 'similarity_thresholds': [0.8, 0.8]}
+        ).execute()
+        print_success(f"search_places_exact_or_fuzzy_batch function working ({len(result.data or [])} rows)")
+    except Exception as e:
+        print_error(f"search_places_exact_or_fuzzy_batch function not found: {e}")
+        print_info("Run the SQL from db_queries.sql in Supabase SQL Editor")
+        return False
+
     # Test 6: Import and test repository
     print_test("Import PlacesRepository")
     try:
         from geocoding.repositories.places_repository import PlacesRepository
-        repo = PlacesRepository(client)
-        print_success("Repository imported and instantiated")
+        print_success("Repository imported")
     except Exception as e:
         print_error(f"Failed to import repository: {e}")
         return False
@@ -235,7 +306,7 @@ def test_phase_2():
     # Test 7: Test repository methods
     print_test("Test repository.search_by_fuzzy_name()")
     try:
-        results = asyncio.run(repo.search_by_fuzzy_name("Lahore", threshold=0.8))
+        results = run_with_repo(lambda repo: repo.search_by_fuzzy_name("Lahore", threshold=0.8))
         if results:
             print_success(f"Repository fuzzy search working ({len(results)} results)")
             print_info(f"  Sample: {results[0]['name']}")
@@ -261,9 +332,7 @@ def test_phase_3():
     
     # Setup
     from geocoding.config import get_settings
-    from supabase import create_client
     settings = get_settings()
-    client = create_client(settings.supabase_url, settings.supabase_key)
     
     # Test 1: External Geocoder
     print_test("Import and test ExternalGeocoder")
@@ -295,14 +364,11 @@ def test_phase_3():
     print_test("Import and test NameMatcher")
     try:
         from geocoding.services.name_matcher import NameMatcher
-        from geocoding.repositories.places_repository import PlacesRepository
         
-        repo = PlacesRepository(client)
-        matcher = NameMatcher(repo, threshold=0.85)
-        print_success("NameMatcher instantiated")
+        print_success("NameMatcher imported")
         
         # Test matching
-        result = asyncio.run(matcher.match("Islamabad"))
+        result = run_with_repo(lambda repo: NameMatcher(repo, threshold=0.85).match("Islamabad"))
         if result:
             print_success(f"Name matching working: {result['name']}")
             print_info(f"  Match method: {result['match_method']}")
@@ -347,17 +413,14 @@ def test_phase_3():
     try:
         from geocoding.services.directional_parser import DirectionalParser
         from geocoding.services.name_matcher import NameMatcher
-        from geocoding.repositories.places_repository import PlacesRepository
         
-        repo = PlacesRepository(client)
-        matcher = NameMatcher(repo)
         parser = DirectionalParser()
         
         test_input = "Central Sindh"
         direction, places = parser.parse(test_input)
         
         if places:
-            match = asyncio.run(matcher.match(places[0]))
+            match = run_with_repo(lambda repo: NameMatcher(repo).match(places[0]))
             if match:
                 print_success(f"Integration test passed")
                 print_info(f"  Input: '{test_input}'")
@@ -387,17 +450,12 @@ def test_phase_4():
     print_test("Complete workflow test")
     try:
         from geocoding.config import get_settings
-        from supabase import create_client
-        from geocoding.repositories.places_repository import PlacesRepository
         from geocoding.services.name_matcher import NameMatcher
         from geocoding.services.directional_parser import DirectionalParser
         from geocoding.services.external_geocoder import ExternalGeocoder
         
         # Setup
         settings = get_settings()
-        client = create_client(settings.supabase_url, settings.supabase_key)
-        repo = PlacesRepository(client)
-        matcher = NameMatcher(repo)
         parser = DirectionalParser()
         geocoder = ExternalGeocoder(settings.locationiq_api_key, settings.locationiq_base_url)
         
@@ -421,7 +479,7 @@ def test_phase_4():
             
             # Match
             if places:
-                match = asyncio.run(matcher.match(places[0]))
+                match = run_with_repo(lambda repo: NameMatcher(repo).match(places[0]))
                 if match:
                     print_info(f"    Matched → {match['name']} (Level {match['hierarchy_level']})")
                 else: